@@ -16,6 +16,11 @@ if not require_auth():
 # ── Authenticated: show dashboard ─────────────────────────────────────────
 logout_button()
 
+# ── Warm-up: los marts se precargan en segundo plano (una vez por proceso) ──
+from data import start_prefetch
+
+start_prefetch()
+
 pages = st.navigation([
     st.Page("pages/01_Ventas.py",          title="Ventas",          icon="\U0001f4ca", default=True),
     st.Page("pages/02_Clientes.py",        title="Clientes",        icon="\U0001f465"),
@@ -1,9 +1,28 @@
 # ════════════════════════════════════════════════════════════════════════════
 # Data loaders — Parquet files (works locally and on Streamlit Cloud)
+# load_*: mart entero (o sus columnas/rango) como DataFrame
+# query: SQL de DuckDB sobre los mismos parquet, devuelve solo el resultado
 # ════════════════════════════════════════════════════════════════════════════
+import atexit
+import datetime
+import functools
+import operator
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import duckdb
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
 import streamlit as st
+from schema import pandas_dtypes
+
+# Copy-on-Write (siempre activo desde pandas 3): las copias superficiales que
+# reciben las páginas no pueden modificar las tablas compartidas del cache.
+# infer_string: texto respaldado por Arrow en vez de object (default en pandas 3)
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+    pd.set_option("future.infer_string", True)
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
 
@@ -11,21 +30,173 @@ SINCE = "2023-01-01"
 UNTIL = "2025-12-31"
 
 
+# Marts con serie de tiempo: export particionado por mes (<tabla>/anio_mes=YYYY-MM/)
+PARTITION_COL = "anio_mes"
+
+
+# Prefetch: hilo de fondo que precarga todos los marts (ver start_prefetch)
+PREFETCH_SECONDS = 60
+PREFETCH_WORKERS = 4
+_prefetch = {"ready": None}   # último snapshot con todos sus marts ya en cache
+_local = threading.local()    # snapshot fijado por los hilos del prefetch
+_stop = threading.Event()
+_errors = set()               # (snapshot, origen, error) ya avisados
+
+
+def _pointer() -> str:
+    """Snapshot al que apunta dashboard/data/CURRENT en este momento"""
+    try:
+        with open(os.path.join(DATA_DIR, "CURRENT")) as f:
+            path = os.path.join(DATA_DIR, "snapshots", f.read().strip())
+        if os.path.isdir(path):
+            return path
+    except FileNotFoundError:
+        pass
+    return DATA_DIR  # export sin snapshots (archivos sueltos en data/)
+
+
 @st.cache_data(ttl=300)
-def load_table(name: str, date_col: str = None, since: str = None, until: str = None) -> pd.DataFrame:
-    path = os.path.join(DATA_DIR, f"{name}.parquet")
-    df = pd.read_parquet(path)
-    if date_col and date_col in df.columns:
+def current_snapshot() -> str:
+    """Directorio del snapshot vigente. Se resuelve una vez por generación de
+    cache: hasta que vence, todas las páginas leen del mismo snapshot aunque un
+    export nuevo ya haya cambiado el puntero. Con el prefetch andando es el
+    snapshot que está precargando (ver _switch_snapshot)"""
+    return _prefetch["ready"] or _pointer()
+
+
+def _snapshot() -> str:
+    return getattr(_local, "snapshot", None) or current_snapshot()
+
+
+def _bounds(since, until):
+    """[(Timestamp, operador)] de since/until. until como fecha sin hora (date o
+    "YYYY-MM-DD") incluye todo ese día: < día siguiente, no <= medianoche"""
+    bounds = []
+    if since:
+        bounds.append((pd.Timestamp(since), operator.ge))
+    if until:
+        is_date = (isinstance(until, datetime.date) and not isinstance(until, datetime.datetime)) or \
+                  (isinstance(until, str) and len(until.strip()) == 10)
+        if is_date:
+            bounds.append((pd.Timestamp(until) + pd.Timedelta(days=1), operator.lt))
+        else:
+            bounds.append((pd.Timestamp(until), operator.le))
+    return bounds
+
+
+def _range_filters(field, since, until):
+    """Condiciones de pyarrow sobre la columna de fecha: Arrow descarta los row
+    groups cuyas estadísticas min/max quedan fuera del rango sin decodificarlos"""
+    conds = []
+    for ts, op in _bounds(since, until):
+        if pa.types.is_timestamp(field.type) and field.type.tz:
+            ts = ts.tz_localize(field.type.tz)
+        conds.append(op(ds.field(field.name), pa.scalar(ts, type=field.type)))
+    return conds
+
+
+def _table_version(snapshot: str, name: str) -> int:
+    """mtime del parquet (o del directorio particionado): en un snapshot nunca
+    cambia; en data/ sin snapshots cambia cuando el export lo reescribe"""
+    for path in (os.path.join(snapshot, name), os.path.join(snapshot, f"{name}.parquet")):
+        if os.path.exists(path):
+            return os.stat(path).st_mtime_ns
+    return 0
+
+
+def _read_table(snapshot: str, name: str, date_col: str = None, since=None, until=None,
+                columns: tuple = None) -> pd.DataFrame:
+    """Lee un mart del snapshot (solo columns y el rango since/until) con los dtypes de schema.py"""
+    path = os.path.join(snapshot, name)
+    if os.path.isdir(path):
+        dataset = ds.dataset(path, format="parquet", partitioning=ds.partitioning(
+            pa.schema([(PARTITION_COL, pa.string())]), flavor="hive"))
+    else:
+        dataset = ds.dataset(f"{path}.parquet", format="parquet")
+    names = [c for c in dataset.schema.names if c != PARTITION_COL]
+    columns = list(columns) if columns is not None else names
+
+    conds, filter_in_pandas = [], False
+    if date_col in names and (since or until):
+        field = dataset.schema.field(date_col)
+        if pa.types.is_timestamp(field.type) or pa.types.is_date(field.type):
+            conds += _range_filters(field, since, until)
+        else:
+            filter_in_pandas = True  # fecha como texto (exports viejos)
+        if PARTITION_COL in dataset.schema.names:
+            # Solo se abren las particiones de los meses que tocan el rango
+            if since:
+                conds.append(ds.field(PARTITION_COL) >= str(since)[:7])
+            if until:
+                conds.append(ds.field(PARTITION_COL) <= str(until)[:7])
+
+    read_columns = columns + [date_col] if filter_in_pandas and date_col not in columns else columns
+    table = dataset.to_table(columns=read_columns,
+                             filter=functools.reduce(operator.and_, conds) if conds else None)
+    nullable = {c for c in table.column_names if table.column(c).null_count}
+    # Conversión de Arrow sin consolidar bloques, liberando cada columna al pasarla
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    del table
+    if date_col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[date_col]):
         df[date_col] = pd.to_datetime(df[date_col])
-        if since:
-            df = df[df[date_col] >= since]
-        if until:
-            df = df[df[date_col] <= until]
+    if filter_in_pandas:
+        for ts, op in _bounds(since, until):
+            df = df[op(df[date_col], ts)]
+        df = df[columns]
+    # Categóricas, enteros compactos y enteros con nulos (exports sin schema incluidos)
+    df = df.astype(pandas_dtypes(name, df.columns, nullable))
+    # El diccionario del parquet trae todas las categorías del archivo, no solo
+    # las de las filas leídas: sin esto value_counts/groupby devuelven ceros
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].cat.remove_unused_categories()
     return df
 
 
-def load_ventas():        return load_table("fct_ventas_diarias", "fecha", SINCE, UNTIL)
-def load_pedidos():       return load_table("fct_pedidos", "fecha", SINCE, UNTIL)
+# Cache único por proceso, compartido por todas las sesiones (cache_resource no
+# copia ni serializa). Sin ttl: la clave cambia sola con el snapshot o el mtime,
+# y el prefetch vacía todo cuando aparece un snapshot nuevo.
+# Sin spinner: lo llenan también los hilos del prefetch, que no tienen página
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _shared_table(snapshot: str, name: str, version: int, date_col: str = None, since=None,
+                  until=None) -> pd.DataFrame:
+    """Marts enteros (con el rango por defecto de su load_*): los que precarga el prefetch"""
+    return _read_table(snapshot, name, date_col, since, until)
+
+
+# Lecturas a medida (columnas o rango elegidos en una página, ej. 14_Clima): cache
+# aparte y chico, así no desalojan a los marts enteros
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _table_slice(snapshot: str, name: str, version: int, date_col: str, since, until,
+                 columns: tuple) -> pd.DataFrame:
+    return _read_table(snapshot, name, date_col, since, until, columns)
+
+
+def has_table(name: str) -> bool:
+    """Si el snapshot vigente tiene ese mart (exports viejos no traen los nuevos)"""
+    return _table_version(_snapshot(), name) != 0
+
+
+def load_table(name: str, date_col: str = None, since=None, until=None, columns=None) -> pd.DataFrame:
+    """Tabla del snapshot vigente. columns: solo esas columnas (se leen solo esas
+    del parquet); since/until (texto o fecha, inclusive): rango sobre date_col,
+    filtrado al leer.
+    Devuelve una copia superficial de la tabla compartida: no copia datos, y con
+    Copy-on-Write lo que la página modifique (df["x"] = ...) queda en su copia"""
+    snapshot = _snapshot()
+    version = _table_version(snapshot, name)
+    if columns is None and since in (None, SINCE) and until in (None, UNTIL):
+        df = _shared_table(snapshot, name, version, date_col, since, until)
+    else:
+        df = _table_slice(snapshot, name, version, date_col, since, until,
+                          tuple(columns) if columns is not None else None)
+    return df.copy(deep=False)
+
+
+def load_ventas(columns=None, since=SINCE, until=UNTIL):
+    return load_table("fct_ventas_diarias", "fecha", since, until, columns)
+def load_pedidos(columns=None, since=SINCE, until=UNTIL):
+    return load_table("fct_pedidos", "fecha", since, until, columns)
 def load_clientes():      return load_table("dim_clientes")
 def load_productos():     return load_table("rpt_productos_vendidos")
 def load_sabores():       return load_table("rpt_sabores")
@@ -37,3 +208,133 @@ def load_margenes():      return load_table("rpt_margenes", "mes", SINCE, UNTIL)
 def load_puntos():        return load_table("rpt_puntos")
 def load_zonas():         return load_table("rpt_zonas")
 def load_clientes_nuevos(): return load_table("rpt_clientes_nuevos", "mes", SINCE, UNTIL)
+
+
+# ── Query engine: DuckDB sobre los parquet del snapshot ──────────────────────
+
+def _export_timezone(snapshot: str):
+    """Zona horaria de los timestamptz exportados (la de la sesión del export)"""
+    for entry in sorted(os.listdir(snapshot)):
+        path = os.path.join(snapshot, entry)
+        if entry.endswith(".parquet") or (os.path.isdir(path) and entry != "snapshots"):
+            for field in ds.dataset(path, format="parquet").schema:
+                if pa.types.is_timestamp(field.type) and field.type.tz:
+                    return field.type.tz
+    return None
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _connection(snapshot: str) -> duckdb.DuckDBPyConnection:
+    """Una conexión por proceso y snapshot: DuckDB en memoria con una vista por
+    mart (mismo nombre) sobre sus parquet; no guarda datos propios"""
+    conn = duckdb.connect()
+    tz = _export_timezone(snapshot)
+    if tz:
+        # Mismo día/semana/mes que los DataFrames de load_table. GLOBAL: las
+        # consultas corren en cursores, que no heredan un SET de la conexión
+        conn.execute(f"SET GLOBAL TimeZone = '{tz}'")
+    for entry in sorted(os.listdir(snapshot)):
+        path = os.path.join(snapshot, entry).replace("'", "''")
+        if entry.endswith(".parquet"):
+            conn.execute(f'CREATE VIEW "{entry[:-8]}" AS SELECT * FROM read_parquet(\'{path}\')')
+        elif os.path.isdir(path) and entry != "snapshots":
+            # Particionado: filtrar por anio_mes o por la fecha poda archivos y row groups
+            conn.execute(f'CREATE VIEW "{entry}" AS SELECT * FROM read_parquet(\'{path}/**/*.parquet\', '
+                         f"hive_partitioning = true, hive_types = {{'{PARTITION_COL}': VARCHAR}})")
+    return conn
+
+
+@st.cache_data(max_entries=256)
+def _query(snapshot: str, sql: str, params: tuple = None) -> pd.DataFrame:
+    # Un cursor por llamada: Streamlit corre cada sesión en su propio thread
+    cursor = _connection(snapshot).cursor()
+    try:
+        return cursor.execute(sql, list(params) if params else None).df()
+    finally:
+        cursor.close()
+
+
+def query(sql: str, params=None) -> pd.DataFrame:
+    """Corre SQL sobre los marts del snapshot vigente (cada mart es una vista con
+    su nombre, ej. fct_pedidos) y devuelve solo el resultado. Filtros y groupbys
+    corren en DuckDB, vectorizados y en paralelo, sin copiar el mart a pandas.
+    params: valores para los ? del SQL (una lista se usa con IN (SELECT unnest(?)))"""
+    return _query(_snapshot(), sql, tuple(params) if params else None)
+
+
+# ── Warm-up y prefetch ───────────────────────────────────────────────────────
+
+LOADERS = [
+    load_ventas, load_pedidos, load_clientes, load_productos, load_sabores, load_pnl, load_cash_flow,
+    load_egresos, load_rfm, load_margenes, load_puntos, load_zonas, load_clientes_nuevos,
+]
+
+
+def _report(snapshot: str, source: str, error: Exception):
+    """Avisa cada error una sola vez por snapshot: el prefetch reintenta cada
+    PREFETCH_SECONDS y un mart roto llenaría el log con el mismo mensaje"""
+    key = (snapshot, source, str(error))
+    if key not in _errors:
+        _errors.add(key)
+        print(f"⚠️  Prefetch {source}: {error}")
+
+
+def _warm(snapshot: str):
+    """Carga todos los load_* de un snapshot en paralelo. Lo que ya está en
+    cache no se relee; lo que el cache descartó (max_entries) se recarga acá
+    y no en la próxima página que lo pida"""
+    def run(loader):
+        _local.snapshot = snapshot
+        try:
+            loader()
+        except Exception as e:
+            _report(snapshot, loader.__name__, e)
+        finally:
+            _local.snapshot = None
+
+    with ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch") as pool:
+        list(pool.map(run, LOADERS))
+    _connection(snapshot)
+
+
+def _switch_snapshot(snapshot: str):
+    """Pasa todas las sesiones al snapshot nuevo y descarta lo cargado del
+    anterior: si no, cada export sumaría una copia entera de los marts a la
+    memoria del proceso hasta que el LRU la desaloje"""
+    _prefetch["ready"] = snapshot
+    current_snapshot.clear()
+    _shared_table.clear()
+    _table_slice.clear()
+    _query.clear()
+
+
+def _prefetch_loop():
+    while not _stop.is_set():
+        snapshot = _pointer()
+        if _prefetch["ready"] not in (None, snapshot):
+            _switch_snapshot(snapshot)
+        try:
+            _warm(snapshot)
+        except Exception as e:
+            _report(snapshot, snapshot, e)
+        # Al arrancar, las sesiones usan el snapshot recién cuando está precargado
+        _prefetch["ready"] = snapshot
+        _stop.wait(PREFETCH_SECONDS)
+
+
+def _stop_prefetch(thread):
+    # Al salir: esperar la vuelta en curso en vez de cortar una lectura a la mitad
+    _stop.set()
+    thread.join(timeout=30)
+
+
+@st.cache_resource
+def start_prefetch() -> threading.Thread:
+    """Arranca (una sola vez por proceso) el hilo que precarga todos los marts
+    al iniciar la app y cada vez que aparece un snapshot nuevo, y que cada
+    PREFETCH_SECONDS vuelve a recorrerlos para recargar lo que se haya caído
+    del cache antes de que lo pida una página"""
+    thread = threading.Thread(target=_prefetch_loop, name="prefetch", daemon=True)
+    thread.start()
+    atexit.register(_stop_prefetch, thread)
+    return thread
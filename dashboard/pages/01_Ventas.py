@@ -5,7 +5,7 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
-from data import load_ventas
+from data import load_ventas, query
 from theme import apply_theme, styled_fig, COLORS, TEAL, DARK_BLUE
 from components import kpi_row, fmt_ars, fmt_usd, fmt_pct, sidebar_date_slicer, filter_by_date
 from ai_chat import ai_chat_section
@@ -39,20 +39,27 @@ st.divider()
 # ── Granularidad: Diario / Semanal / Mensual ─────────────────────────────────
 tab_d, tab_s, tab_m = st.tabs(["Diario", "Semanal", "Mensual"])
 
-# Preparar agrupaciones
-filtered["semana_dt"] = filtered["fecha"].dt.to_period("W").apply(lambda x: x.start_time)
-filtered["mes_dt"] = filtered["fecha"].dt.to_period("M").dt.to_timestamp()
+# Agrupaciones en DuckDB: solo vuelve una fila por semana/mes
+RANGO = "fecha::DATE BETWEEN ? AND ?"
+AGG = """
+    sum(pedidos_totales)::BIGINT AS pedidos_totales,
+    sum(kg_totales) AS kg_totales,
+    sum(venta_total) AS venta_total,
+    sum(venta_total_usd) AS venta_total_usd
+"""
+
+
+def agrupar(periodo, alias):
+    return query(f"""
+        SELECT date_trunc('{periodo}', fecha)::DATE AS {alias}, {AGG}
+        FROM fct_ventas_diarias WHERE {RANGO}
+        GROUP BY 1 ORDER BY 1
+    """, [start_date, end_date])
 
-AGG = {
-    "pedidos_totales": "sum",
-    "kg_totales": "sum",
-    "venta_total": "sum",
-    "venta_total_usd": "sum",
-}
 
 daily = filtered.sort_values("fecha")
-weekly = filtered.groupby("semana_dt", as_index=False).agg(**{k: (k, v) for k, v in AGG.items()}).sort_values("semana_dt")
-monthly = filtered.groupby("mes_dt", as_index=False).agg(**{k: (k, v) for k, v in AGG.items()}).sort_values("mes_dt")
+weekly = agrupar("week", "semana_dt")
+monthly = agrupar("month", "mes_dt")
 
 
 def render_ventas(data, x_col, title_prefix):
@@ -100,16 +107,14 @@ st.divider()
 # ── Mix de pagos mensual ─────────────────────────────────────────────────────
 st.subheader("Mix de Pagos por Mes")
 
-filtered["mes_str"] = filtered["fecha"].dt.to_period("M").astype(str)
-monthly_pay = (
-    filtered.groupby("mes_str", as_index=False)
-    .agg(
-        Efectivo=("pagos_efectivo", "sum"),
-        MercadoPago=("pagos_mercadopago", "sum"),
-        Transferencia=("pagos_transferencia", "sum"),
-    )
-    .sort_values("mes_str")
-)
+monthly_pay = query(f"""
+    SELECT strftime(fecha, '%Y-%m') AS mes_str,
+        sum(pagos_efectivo)::BIGINT AS Efectivo,
+        sum(pagos_mercadopago)::BIGINT AS MercadoPago,
+        sum(pagos_transferencia)::BIGINT AS Transferencia
+    FROM fct_ventas_diarias WHERE {RANGO}
+    GROUP BY 1 ORDER BY 1
+""", [start_date, end_date])
 pay_melted = monthly_pay.melt(id_vars="mes_str", var_name="Medio de Pago", value_name="Pedidos")
 fig_pay = px.bar(pay_melted, x="mes_str", y="Pedidos", color="Medio de Pago",
                  barmode="stack", labels={"mes_str": "Mes", "Pedidos": "Pedidos (Q)"},
@@ -124,10 +129,12 @@ col1, col2 = st.columns(2)
 
 with col1:
     if "estacion" in filtered.columns:
-        est = filtered.groupby("estacion", as_index=False).agg(
-            pedidos=("pedidos_totales", "sum"), kg=("kg_totales", "sum"),
-            ars=("venta_total", "sum"), usd=("venta_total_usd", "sum"),
-        )
+        est = query(f"""
+            SELECT estacion, sum(pedidos_totales)::BIGINT AS pedidos, sum(kg_totales) AS kg,
+                sum(venta_total) AS ars, sum(venta_total_usd) AS usd
+            FROM fct_ventas_diarias WHERE {RANGO} AND estacion IS NOT NULL
+            GROUP BY 1
+        """, [start_date, end_date])
         est_order = ["Verano", "Otoño", "Invierno", "Primavera"]
         est["estacion"] = pd.Categorical(est["estacion"], categories=est_order, ordered=True)
         est = est.sort_values("estacion")
@@ -140,10 +147,12 @@ with col1:
 
 with col2:
     if "temporada" in filtered.columns:
-        tmp = filtered.groupby("temporada", as_index=False).agg(
-            pedidos=("pedidos_totales", "sum"), kg=("kg_totales", "sum"),
-            ars=("venta_total", "sum"), usd=("venta_total_usd", "sum"),
-        )
+        tmp = query(f"""
+            SELECT temporada, sum(pedidos_totales)::BIGINT AS pedidos, sum(kg_totales) AS kg,
+                sum(venta_total) AS ars, sum(venta_total_usd) AS usd
+            FROM fct_ventas_diarias WHERE {RANGO} AND temporada IS NOT NULL
+            GROUP BY 1
+        """, [start_date, end_date])
         tmp_order = ["Alta", "Media", "Baja"]
         tmp["temporada"] = pd.Categorical(tmp["temporada"], categories=tmp_order, ordered=True)
         tmp = tmp.sort_values("temporada")
@@ -35,7 +35,9 @@ st.divider()
 # ── Pie chart: segmento_cliente ───────────────────────────────────────────────
 st.subheader("Distribucion por Segmento")
 
-seg_counts = buyers["segmento_cliente"].value_counts().reset_index()
+# Columnas categóricas: value_counts incluye en 0 las categorías sin clientes
+# (ej. "Sin compras", que buyers deja afuera)
+seg_counts = buyers["segmento_cliente"].value_counts()[lambda s: s > 0].reset_index()
 seg_counts.columns = ["Segmento", "Clientes"]
 
 fig_pie = px.pie(
@@ -70,7 +72,7 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.subheader("Tipo de Retiro Preferido")
-    retiro = buyers["tipo_retiro_preferido"].value_counts().reset_index()
+    retiro = buyers["tipo_retiro_preferido"].value_counts()[lambda s: s > 0].reset_index()
     retiro.columns = ["Tipo", "Clientes"]
     fig_r = px.bar(
         retiro, x="Tipo", y="Clientes",
@@ -83,7 +85,7 @@ with col1:
 
 with col2:
     st.subheader("Tipo de Pago Preferido")
-    pago = buyers["tipo_pago_preferido"].value_counts().reset_index()
+    pago = buyers["tipo_pago_preferido"].value_counts()[lambda s: s > 0].reset_index()
     pago.columns = ["Pago", "Clientes"]
     fig_p = px.bar(
         pago, x="Pago", y="Clientes",
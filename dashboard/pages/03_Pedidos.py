@@ -4,7 +4,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 import pandas as pd
 import plotly.express as px
 import streamlit as st
-from data import load_pedidos
+from data import load_pedidos, query, has_table
 from theme import apply_theme, styled_fig, COLORS, TEAL, DARK_BLUE
 from components import kpi_row, fmt_ars, fmt_usd, fmt_pct, sidebar_date_slicer, filter_by_date
 from ai_chat import ai_chat_section
@@ -29,18 +29,39 @@ tipo_pago = st.sidebar.multiselect("Tipo de pago", tipo_pago_opts, default=tipo_
 estado_opts = sorted(df["estado_nombre"].dropna().unique())
 estados = st.sidebar.multiselect("Estado", estado_opts, default=estado_opts)
 
-mask = (
-    df["tipo_retiro"].isin(tipo_retiro)
-    & df["tipo_pago"].isin(tipo_pago)
-    & df["estado_nombre"].isin(estados)
-)
-filtered = df[mask].copy()
+# Los filtros corren en DuckDB: cada gráfico trae solo su resultado
+FILTROS = """
+    fecha::DATE BETWEEN ? AND ?
+    AND tipo_retiro IN (SELECT unnest(?::VARCHAR[]))
+    AND tipo_pago IN (SELECT unnest(?::VARCHAR[]))
+    AND estado_nombre IN (SELECT unnest(?::VARCHAR[]))
+"""
+params = [start_date, end_date, tipo_retiro, tipo_pago, estados]
 
 # ── KPIs ──────────────────────────────────────────────────────────────────────
-total_pedidos = len(filtered)
-total_kg = filtered["kg_total"].sum() if "kg_total" in filtered.columns else 0
-total_ventas = filtered["total"].sum()
-total_ventas_usd = filtered["total_usd"].sum() if "total_usd" in filtered.columns else 0
+# Salen del cubo pre-agregado (una fila por día y combinación de retiro, pago
+# y estado) en vez de sumar todos los pedidos filtrados. Un export sin el cubo
+# suma fct_pedidos con los mismos filtros
+if has_table("rpt_cubo_ventas"):
+    kpis = query("""
+        SELECT coalesce(sum(pedidos), 0)::BIGINT AS pedidos, coalesce(sum(kg), 0) AS kg,
+               coalesce(sum(venta), 0) AS venta, coalesce(sum(venta_usd), 0) AS venta_usd
+        FROM rpt_cubo_ventas
+        WHERE fecha BETWEEN ? AND ?
+        AND tipo_retiro IN (SELECT unnest(?::VARCHAR[]))
+        AND tipo_pago IN (SELECT unnest(?::VARCHAR[]))
+        AND estado_nombre IN (SELECT unnest(?::VARCHAR[]))
+    """, params).iloc[0]
+else:
+    kpis = query(f"""
+        SELECT count(*) AS pedidos, coalesce(sum(kg_total), 0) AS kg,
+               coalesce(sum(total), 0) AS venta, coalesce(sum(total_usd), 0) AS venta_usd
+        FROM fct_pedidos WHERE {FILTROS}
+    """, params).iloc[0]
+total_pedidos = int(kpis["pedidos"])
+total_kg = kpis["kg"]
+total_ventas = kpis["venta"]
+total_ventas_usd = kpis["venta_usd"]
 
 kpi_row([
     ("Pedidos (Q)", f"{total_pedidos:,}"),
@@ -54,8 +75,11 @@ st.divider()
 # ── Bar chart: pedidos by hora ────────────────────────────────────────────────
 st.subheader("Pedidos por Hora del Dia")
 
-hour_counts = filtered["hora"].value_counts().sort_index().reset_index()
-hour_counts.columns = ["Hora", "Pedidos"]
+hour_counts = query(f"""
+    SELECT hora AS Hora, count(*) AS Pedidos
+    FROM fct_pedidos WHERE {FILTROS} AND hora IS NOT NULL
+    GROUP BY 1 ORDER BY 1
+""", params)
 
 fig_hour = px.bar(
     hour_counts, x="Hora", y="Pedidos",
@@ -70,9 +94,12 @@ st.divider()
 # ── Bar chart: pedidos by horario ─────────────────────────────────────────────
 st.subheader("Pedidos por Franja Horaria")
 
-if "horario" in filtered.columns:
-    horario_counts = filtered["horario"].value_counts().reset_index()
-    horario_counts.columns = ["Horario", "Pedidos"]
+if "horario" in df.columns:
+    horario_counts = query(f"""
+        SELECT horario AS Horario, count(*) AS Pedidos
+        FROM fct_pedidos WHERE {FILTROS} AND horario IS NOT NULL
+        GROUP BY 1
+    """, params)
     horario_order = ["Mediodia", "Tarde", "Noche", "Trasnoche", "Otro"]
     horario_counts["Horario"] = pd.Categorical(
         horario_counts["Horario"], categories=horario_order, ordered=True
@@ -98,10 +125,14 @@ show_cols = [
     "tipo_pago", "subtotal", "descuento", "costo_envio", "total", "total_usd",
     "kg_total", "estado_nombre", "hora", "horario", "cantidad_productos",
 ]
-available_cols = [c for c in show_cols if c in filtered.columns]
+available_cols = [c for c in show_cols if c in df.columns]
 
 st.dataframe(
-    filtered[available_cols].sort_values("fecha", ascending=False),
+    query(f"""
+        SELECT {", ".join(available_cols)}
+        FROM fct_pedidos WHERE {FILTROS}
+        ORDER BY fecha DESC
+    """, params),
     width='stretch',
     hide_index=True,
 )
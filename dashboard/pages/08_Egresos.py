@@ -34,7 +34,7 @@ st.divider()
 # ── Treemap: monto_total by categoria ─────────────────────────────────────────
 st.subheader("Distribucion de Egresos por Categoria")
 
-cat_totals = filtered.groupby("categoria", as_index=False)["monto_total"].sum()
+cat_totals = filtered.groupby("categoria", as_index=False, observed=True)["monto_total"].sum()
 
 fig_tree = px.treemap(
     cat_totals,
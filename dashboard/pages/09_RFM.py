@@ -34,7 +34,7 @@ st.divider()
 # ── Segment distribution bar chart ───────────────────────────────────────────
 st.subheader("Distribucion por Segmento")
 
-seg_counts = df["segmento_cliente"].value_counts().reset_index()
+seg_counts = df["segmento_cliente"].value_counts()[lambda s: s > 0].reset_index()
 seg_counts.columns = ["Segmento", "Clientes"]
 
 seg_color_map = {seg: SEGMENT_COLORS.get(seg, TEAL) for seg in seg_counts["Segmento"]}
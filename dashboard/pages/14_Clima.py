@@ -7,17 +7,21 @@ import plotly.graph_objects as go
 import streamlit as st
 from data import load_ventas
 from theme import apply_theme, styled_fig, COLORS, TEAL, DARK_BLUE, SAGE_GREEN, RED, ORANGE
-from components import kpi_row, fmt_ars, fmt_usd, fmt_pct, sidebar_date_slicer, filter_by_date
+from components import kpi_row, fmt_ars, fmt_usd, fmt_pct, sidebar_date_slicer
 from ai_chat import ai_chat_section
 
 apply_theme()
 st.title("Impacto del Clima")
 
 # ── Load & filter ─────────────────────────────────────────────────────────────
-df = load_ventas()
-df["fecha"] = pd.to_datetime(df["fecha"])
+# Solo las columnas de clima y pedidos que usa la página, y solo el rango elegido
 start_date, end_date = sidebar_date_slicer("clima")
-df = filter_by_date(df, "fecha", start_date, end_date)
+df = load_ventas(
+    columns=["fecha", "estacion", "temperatura_promedio", "categoria_temperatura",
+             "categoria_precipitacion", "pedidos_totales", "kg_totales", "venta_total_usd",
+             "pedidos_delivery", "pedidos_local", "pedidos_mostrador"],
+    since=start_date, until=end_date,
+)
 
 # Filter rows with clima data
 df = df[df["temperatura_promedio"].notna()].copy()
@@ -71,7 +75,7 @@ st.subheader("Metricas por Categoria de Temperatura")
 
 if "categoria_temperatura" in df.columns:
     temp_order = ["Muy frio", "Frio", "Templado", "Calido", "Muy calido"]
-    temp_agg = df.groupby("categoria_temperatura", as_index=False).agg(
+    temp_agg = df.groupby("categoria_temperatura", as_index=False, observed=True).agg(
         dias=("fecha", "count"),
         pedidos_prom=("pedidos_totales", "mean"),
         kg_prom=("kg_totales", "mean"),
@@ -129,7 +133,7 @@ st.divider()
 st.subheader("Impacto de Precipitaciones")
 
 if "categoria_precipitacion" in df.columns:
-    rain_agg = df.groupby("categoria_precipitacion", as_index=False).agg(
+    rain_agg = df.groupby("categoria_precipitacion", as_index=False, observed=True).agg(
         dias=("fecha", "count"),
         pedidos_prom=("pedidos_totales", "mean"),
         kg_prom=("kg_totales", "mean"),
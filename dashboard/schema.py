@@ -0,0 +1,99 @@
+# ════════════════════════════════════════════════════════════════════════════
+# Dtypes compactos de los marts — los aplica export_parquet.py al escribir el
+# parquet y data.py al cargarlo (sin streamlit: lo importan los scripts)
+#   "category": texto de pocos valores → diccionario en Arrow, categórica en pandas
+#   "int8"/"int16"/"int32": enteros acotados (DuckDB los exporta como BIGINT)
+#   "Int8"/"Int16"/"Int32": entero con nulos (sin esto pandas lo carga como
+#   float64, y astype a "int8" falla con los nulos)
+# Columnas que no están acá: DOUBLE para montos/kg y texto de Arrow
+# Tablas chicas (rpt_productos_vendidos, rpt_sabores, rpt_pnl, rpt_zonas...)
+# no vale la pena tiparlas
+# ════════════════════════════════════════════════════════════════════════════
+import pyarrow as pa
+
+CATEGORY = "category"
+
+# Columnas de calendario que repiten varios marts
+_CALENDARIO = {"anio": "int16", "mes_num": "int8"}
+_DIA = {**_CALENDARIO, "dia_semana": "int8", "estacion": CATEGORY, "temporada": CATEGORY}
+
+TABLE_DTYPES = {
+    "fct_ventas_diarias": {
+        **_DIA,
+        "categoria_temperatura": CATEGORY, "categoria_precipitacion": CATEGORY, "categoria_viento": CATEGORY,
+        # Clima por LEFT JOIN: nulos en los días sin dato (viento_max_kmh queda
+        # DOUBLE: tiene decimales)
+        "flg_precipitaciones": "Int8",
+        "pedidos_sistema": "int32", "pedidos_plataforma": "int32", "pedidos_totales": "int32",
+        "q_pedidos_real": "int32", "clientes_unicos": "int32",
+        "pedidos_delivery": "int32", "pedidos_local": "int32", "pedidos_mostrador": "int32",
+        "pagos_efectivo": "int32", "pagos_mercadopago": "int32", "pagos_transferencia": "int32",
+        "pedidos_primer_pedido": "int32",
+    },
+    "fct_pedidos": {
+        **_DIA,
+        "pedido_id": "int32", "cliente_id": "int32",
+        "cliente_id_mail_phone": "Int32", "direccion_id": "Int32", "demora_minutos": "Int32",
+        "hora": "int8", "estado_id": "int8", "is_pagado": "int8", "is_activo": "int8",
+        "cantidad_productos": "int16", "cantidad_sabores": "int16",
+        "barrio": CATEGORY, "horario": CATEGORY, "tipo_retiro": CATEGORY, "tipo_pago": CATEGORY,
+        "estado_nombre": CATEGORY, "mercadopago_status": CATEGORY, "repartidor": CATEGORY,
+    },
+    "dim_clientes": {
+        "cliente_id_mail_phone": "Int32", "cliente_id": "int32", "n_cliente_ids": "int16",
+        "is_activo": "int8", "recencia_score": "int8", "frecuencia_score": "int8",
+        "monetario_score": "int8", "rfm_total": "int8",
+        "total_pedidos": "int32", "dias_desde_ultimo_pedido": "int32",
+        "pedidos_delivery": "int32", "pedidos_local": "int32", "pedidos_mostrador": "int32",
+        "pagos_efectivo": "int32", "pagos_mercadopago": "int32", "pagos_transferencia": "int32",
+        "tipo_identidad": CATEGORY, "tipo_cliente": CATEGORY, "barrio": CATEGORY,
+        "tipo_retiro_preferido": CATEGORY, "tipo_pago_preferido": CATEGORY, "segmento_cliente": CATEGORY,
+    },
+    "rpt_rfm": {
+        "cliente_id_mail_phone": "Int32", "cliente_id": "int32",
+        "recencia_score": "int8", "frecuencia_score": "int8", "monetario_score": "int8", "rfm_total": "int8",
+        "total_pedidos": "int32", "dias_desde_ultimo_pedido": "int32",
+        "tipo_cliente": CATEGORY, "tipo_identidad": CATEGORY, "barrio": CATEGORY, "segmento_cliente": CATEGORY,
+        "recencia_label": CATEGORY, "frecuencia_label": CATEGORY, "volumen_label": CATEGORY,
+        "tipo_retiro_preferido": CATEGORY, "tipo_pago_preferido": CATEGORY,
+    },
+    "rpt_puntos": {
+        "cliente_id_mail_phone": "Int32", "cliente_id": "int32", "segmento_cliente": CATEGORY,
+        "total_movimientos": "int32", "movimientos_acumulacion": "int32", "movimientos_canje": "int32",
+    },
+    "rpt_egresos": {**_CALENDARIO, "categoria": CATEGORY, "cantidad_egresos": "int32"},
+    "rpt_margenes": {**_CALENDARIO, "dimension_tipo": CATEGORY, "dimension_valor": CATEGORY, "pedidos": "int32"},
+    "rpt_clientes_nuevos": {
+        **_CALENDARIO, "estacion": CATEGORY, "temporada": CATEGORY,
+        "clientes_nuevos": "int32", "clientes_nuevos_mes_anterior": "Int32",
+        "nuevos_delivery": "int32", "nuevos_local": "int32", "nuevos_mostrador": "int32",
+        "nuevos_efectivo": "int32", "nuevos_mp": "int32", "nuevos_transferencia": "int32",
+    },
+    "rpt_cubo_ventas": {
+        "tipo_retiro": CATEGORY, "tipo_pago": CATEGORY, "estado_nombre": CATEGORY, "pedidos": "int32",
+    },
+}
+
+_ARROW_TYPES = {
+    CATEGORY: pa.dictionary(pa.int32(), pa.string()),
+    "int8": pa.int8(), "int16": pa.int16(), "int32": pa.int32(),
+    "Int8": pa.int8(), "Int16": pa.int16(), "Int32": pa.int32(),
+}
+
+
+def arrow_schema(table: str, schema: pa.Schema) -> pa.Schema:
+    """Schema de Arrow con los dtypes compactos de la tabla (para el export)"""
+    dtypes = TABLE_DTYPES.get(table, {})
+    return pa.schema([
+        field.with_type(_ARROW_TYPES[dtypes[field.name]]) if field.name in dtypes else field
+        for field in schema
+    ], metadata=schema.metadata)
+
+
+def pandas_dtypes(table: str, columns, nullable=()) -> dict:
+    """{columna: dtype} para DataFrame.astype al cargar (solo columnas presentes).
+    nullable: columnas que traen nulos; si schema.py las declara sin nulos
+    ("int8"...) van con su versión con nulos ("Int8"...) en vez de fallar"""
+    dtypes = TABLE_DTYPES.get(table, {})
+    return {c: dtypes[c].capitalize() if c in nullable and dtypes[c].startswith("int") else dtypes[c]
+            for c in columns if c in dtypes}
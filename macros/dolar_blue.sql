@@ -0,0 +1,24 @@
+{#
+    Cotización blue vigente a un timestamp: la última cotización con fecha <= ts.
+    ASOF JOIN de DuckDB: un merge sobre ambos lados ordenados en vez de un hash
+    join sobre cast(ts as date). Fines de semana, feriados y días posteriores a la
+    última cotización toman la anterior; la primera cotización también cubre las
+    fechas previas, así los *_usd nunca quedan en NULL.
+
+    Uso:
+        from pedidos p
+        {{ asof_join_dolar_blue('p.created_at') }}
+    y después db.valor_blue en el select.
+#}
+{% macro asof_join_dolar_blue(ts_column, alias='db') %}
+asof left join (
+    select
+        case
+            when fecha = min(fecha) over () then '-infinity'::timestamptz
+            else fecha::timestamptz
+        end as vigente_desde,
+        valor_blue
+    from {{ ref('stg_dolar_blue') }}
+) {{ alias }}
+    on {{ ts_column }} >= {{ alias }}.vigente_desde
+{%- endmacro %}
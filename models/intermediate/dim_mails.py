@@ -0,0 +1,188 @@
+# ════════════════════════════════════════════════════════════════════════════
+# dim_mails: resolución de identidad de clientes (union-find)
+# Campo clave: cliente_id_mail_phone
+#   Grafo cliente ↔ email ↔ teléfono: clientes que comparten email o teléfono
+#   quedan en la misma identidad, también en cadena (email A ↔ tel X ↔ email B)
+#   1. Identidad con algún email → id positivo
+#      ('email' si el cliente tiene email, 'phone_bridge' si llega por teléfono)
+#   2. Identidad solo por teléfono → id negativo ('phone_only')
+#   3. Sin email ni teléfono → NULL ('sin_identidad')
+#
+# Fuentes de teléfono: stg_clientes + stg_pedidos (el más frecuente)
+# Teléfonos de más de dim_mails_max_clientes_por_telefono clientes (el del
+# local, uno de prueba) no unen identidades
+#
+# Incremental: el union-find se recalcula entero (casi lineal), pero cada
+# identidad conserva su id entre corridas y solo se reescriben los clientes
+# que cambiaron. --full-refresh renumera todo
+# ════════════════════════════════════════════════════════════════════════════
+
+import pandas as pd
+
+
+class UnionFind:
+    """Componentes conexas con compresión de caminos y unión por tamaño"""
+
+    def __init__(self, n):
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, x):
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+
+
+def telefonos_unificados(session, clientes, pedidos):
+    """Email y teléfono de cada cliente: teléfono de stg_clientes (preferido) o
+    el más frecuente en stg_pedidos, normalizados con TRIM"""
+    return session.sql("""
+        with phone_pedidos as (
+            select cliente_id, trim(telefono) as telefono
+            from pedidos
+            where telefono is not null and trim(telefono) != ''
+              and cliente_id not in (0, 1)  -- excluir catch-all clients
+            group by cliente_id, trim(telefono)
+            qualify row_number() over (
+                partition by cliente_id
+                order by count(*) desc, trim(telefono)
+            ) = 1
+        )
+        select
+            c.cliente_id,
+            nullif(c.email, '') as email,
+            coalesce(nullif(trim(c.telefono), ''), pp.telefono) as telefono
+        from clientes c
+        left join phone_pedidos pp on c.cliente_id = pp.cliente_id
+        order by c.cliente_id
+    """).df()
+
+
+def resolver_componentes(grafo, max_clientes_por_telefono):
+    """Raíz de la componente de cada cliente (None si no tiene email ni un
+    teléfono que identifique)"""
+    clientes_por_telefono = grafo['telefono'].value_counts()
+    hubs = set(clientes_por_telefono[clientes_por_telefono > max_clientes_por_telefono].index)
+
+    uf = UnionFind(len(grafo))
+    primer_cliente = {}  # email/teléfono → primer cliente (índice) que lo usa
+    identificable = [False] * len(grafo)
+    for i, (email, telefono) in enumerate(zip(grafo['email'], grafo['telefono'])):
+        claves = []
+        if not pd.isna(email):
+            claves.append(('email', email))
+        if not pd.isna(telefono) and telefono not in hubs:
+            claves.append(('telefono', telefono))
+        for clave in claves:
+            identificable[i] = True
+            if clave in primer_cliente:
+                uf.union(primer_cliente[clave], i)
+            else:
+                primer_cliente[clave] = i
+
+    return [uf.find(i) if identificable[i] else None for i in range(len(grafo))]
+
+
+def asignar_ids(grafo, ids_previos):
+    """Id de cada componente (positivo si tiene algún email, negativo si no).
+    Conserva el id previo más votado por sus clientes; las identidades nuevas,
+    las que cambian de signo o la parte menor de una que se separó reciben el
+    siguiente id libre"""
+    componentes = (grafo.dropna(subset=['raiz'])
+                   .assign(tiene_email=grafo['email'].notna())
+                   .groupby('raiz').agg(
+                       con_email=('tiene_email', 'max'),
+                       n_clientes=('cliente_id', 'size'),
+                       primer_cliente=('cliente_id', 'min'),
+                   ))
+    componentes['signo'] = componentes['con_email'].map({True: 1, False: -1})
+
+    ids = {}
+    previos = ids_previos.dropna(subset=['cliente_id_mail_phone'])
+    if not previos.empty:
+        votos = (grafo[['raiz', 'cliente_id']].dropna(subset=['raiz'])
+                 .merge(previos, on='cliente_id')
+                 .groupby(['raiz', 'cliente_id_mail_phone']).size()
+                 .rename('votos').reset_index())
+        votos['signo'] = componentes['signo'].reindex(votos['raiz']).to_numpy()
+        votos = votos[votos['cliente_id_mail_phone'] * votos['signo'] > 0]
+        votos['n_clientes'] = componentes['n_clientes'].reindex(votos['raiz']).to_numpy()
+        # Las componentes más grandes eligen primero: ante una separación, la
+        # parte mayor se queda con el id
+        votos = votos.sort_values(['n_clientes', 'raiz', 'votos', 'cliente_id_mail_phone'],
+                                  ascending=[False, True, False, True])
+        usados = set()
+        for raiz, id_previo in zip(votos['raiz'], votos['cliente_id_mail_phone']):
+            if raiz not in ids and id_previo not in usados:
+                ids[raiz] = int(id_previo)
+                usados.add(id_previo)
+
+    siguiente = {1: int(max(previos['cliente_id_mail_phone'].max(), 0)) if not previos.empty else 0,
+                 -1: int(min(previos['cliente_id_mail_phone'].min(), 0)) if not previos.empty else 0}
+    for raiz, signo in componentes.sort_values('primer_cliente')['signo'].items():
+        if raiz not in ids:
+            siguiente[signo] += signo
+            ids[raiz] = siguiente[signo]
+
+    return grafo['raiz'].map(ids)
+
+
+def model(dbt, session):
+    dbt.config(
+        materialized='incremental',
+        unique_key='cliente_id',
+        incremental_strategy='delete+insert',
+    )
+    max_clientes_por_telefono = int(dbt.config.get('max_clientes_por_telefono'))
+
+    clientes = dbt.ref('stg_clientes')
+    pedidos = dbt.ref('stg_pedidos')
+    grafo = telefonos_unificados(session, clientes, pedidos)
+    grafo['raiz'] = resolver_componentes(grafo, max_clientes_por_telefono)
+
+    if dbt.is_incremental:
+        ids_previos = session.sql(f"select cliente_id, cliente_id_mail_phone from {dbt.this}").df()
+    else:
+        ids_previos = pd.DataFrame({'cliente_id': [], 'cliente_id_mail_phone': []})
+    grafo['cliente_id_mail_phone'] = asignar_ids(grafo, ids_previos)
+
+    identidades = grafo[['cliente_id', 'cliente_id_mail_phone', 'telefono']]
+    resultado = session.sql("""
+        select
+            cast(i.cliente_id_mail_phone as bigint) as cliente_id_mail_phone,
+            case when i.cliente_id_mail_phone > 0 then cast(i.cliente_id_mail_phone as bigint) end as id_mail,
+            case when i.cliente_id_mail_phone < 0 then cast(i.cliente_id_mail_phone as bigint) end as id_phone,
+            case
+                when i.cliente_id_mail_phone is null then 'sin_identidad'
+                when nullif(c.email, '') is not null then 'email'
+                when i.cliente_id_mail_phone > 0 then 'phone_bridge'
+                else 'phone_only'
+            end as tipo_identidad,
+            c.cliente_id,
+            nullif(c.email, '') as email,
+            cast(i.telefono as varchar) as telefono,
+            c.nombre,
+            c.is_activo,
+            c.created_at
+        from clientes c
+        inner join identidades i on c.cliente_id = i.cliente_id
+    """)
+
+    if dbt.is_incremental:
+        # Clientes borrados en el origen: delete+insert solo reemplaza los que vuelven
+        session.sql(f"delete from {dbt.this} where cliente_id not in (select cliente_id from identidades)")
+        # Solo clientes nuevos o con algún cambio (delete+insert por cliente_id)
+        anterior = session.sql(f"select * from {dbt.this}")
+        return session.sql("select * from resultado except select * from anterior")
+    return resultado.order('cliente_id_mail_phone nulls last, created_at desc')
@@ -1,11 +1,14 @@
 {{
     config(
-        materialized='view'
+        materialized='table'
     )
 }}
 
 -- ════════════════════════════════════════════════════════════════════════════
 -- int_costos_pedido: calcula el costo de ingredientes + packaging por pedido
+-- El costo de ingredientes sale de int_lineas_sabor (split y costo por sabor)
+-- Tabla ordenada por pedido_id: los zonemaps de DuckDB acotan los filtros
+-- por pedido_id
 -- ════════════════════════════════════════════════════════════════════════════
 
 with pedidos_fecha as (
@@ -16,26 +19,7 @@ with pedidos_fecha as (
     from {{ ref('stg_pedidos') }}
 ),
 
--- ── Cada sabor dentro de cada producto de cada pedido ───────────────────────
-lineas_sabor as (
-    select
-        pp.pedido_id,
-        pp.pedido_producto_id,
-        pp.producto_id,
-        pps.sabor_id,
-        pr.peso_kg,
-        pr.nombre as producto_nombre,
-        -- Contar cuántos sabores tiene este producto en este pedido
-        count(*) over (partition by pp.pedido_producto_id) as sabores_en_producto
-    from {{ ref('stg_pedidos_productos') }} pp
-    inner join {{ ref('stg_productos') }} pr
-        on pp.producto_id = pr.producto_id
-    inner join {{ ref('stg_pedidos_productos_sabores') }} pps
-        on pp.pedido_producto_id = pps.pedido_producto_id
-    where pr.peso_kg > 0
-),
-
--- ── Costo promedio por kg por mes (para fallback y escalar packaging) ────────
+-- ── Costo promedio por kg por mes (para escalar packaging) ──────────────────
 indice_costos as (
     select
         mes,
@@ -45,35 +29,11 @@ indice_costos as (
     group by mes
 ),
 
--- ── Peso por sabor y cruce con costos ───────────────────────────────────────
+-- ── Líneas de sabor con kg y costo (int_lineas_sabor) ───────────────────────
 lineas_con_costo as (
-    select
-        ls.pedido_id,
-        ls.pedido_producto_id,
-        ls.producto_id,
-        ls.sabor_id,
-        ls.producto_nombre,
-        ls.peso_kg,
-        ls.sabores_en_producto,
-        pf.fecha,
-        pf.mes,
-        -- kg que corresponde a este sabor
-        ls.peso_kg / nullif(ls.sabores_en_producto, 0) as kg_por_sabor,
-        cs.costo_por_kg,
-        -- Fallback: si no hay costo del sabor, usar promedio del mes
-        coalesce(cs.costo_por_kg, ic.avg_costo_kg) as costo_por_kg_usado,
-        case when cs.costo_por_kg is not null then 'exacto' else 'promedio' end as tipo_costo,
-        -- Costo de este sabor = kg × costo/kg (con fallback a promedio)
-        (ls.peso_kg / nullif(ls.sabores_en_producto, 0))
-            * coalesce(cs.costo_por_kg, ic.avg_costo_kg, 0) as costo_sabor
-    from lineas_sabor ls
-    inner join pedidos_fecha pf
-        on ls.pedido_id = pf.pedido_id
-    left join {{ ref('stg_costos_sabores') }} cs
-        on ls.sabor_id = cs.sabor_id
-        and pf.mes = cs.mes
-    left join indice_costos ic
-        on pf.mes = ic.mes
+    select pedido_id, tipo_costo, costo_sabor
+    from {{ ref('int_lineas_sabor') }}
+    where peso_kg > 0
 ),
 
 -- ── Costo de ingredientes por pedido ────────────────────────────────────────
@@ -181,3 +141,4 @@ left join costo_ingredientes ci
     on pf.pedido_id = ci.pedido_id
 left join costo_packaging cp
     on pf.pedido_id = cp.pedido_id
+order by pf.pedido_id
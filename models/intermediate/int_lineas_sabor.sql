@@ -0,0 +1,111 @@
+{{
+    config(
+        materialized='table'
+    )
+}}
+
+-- ════════════════════════════════════════════════════════════════════════════
+-- int_lineas_sabor: una fila por sabor dentro de cada producto de cada pedido
+-- Base de todos los modelos a nivel sabor (int_costos_pedido, rpt_sabores,
+-- rpt_sabores_populares, fct_pedidos): el join pedidos × productos × sabores
+-- y el split de kg por sabor (window) se calculan una sola vez por corrida
+-- Incluye productos sin peso (peso_kg <= 0, kg_por_sabor = 0): los modelos
+-- de kg/costo filtran peso_kg > 0
+-- Tabla ordenada por pedido_id: los zonemaps de DuckDB acotan los filtros
+-- por pedido_id del incremental de fct_pedidos
+-- ════════════════════════════════════════════════════════════════════════════
+
+with pedidos as (
+    select
+        pedido_id,
+        created_at,
+        estado_id,
+        is_activo,
+        date_trunc('day', created_at) as fecha,
+        strftime(created_at, '%Y-%m') as mes
+    from {{ ref('stg_pedidos') }}
+),
+
+-- ── Cada sabor dentro de cada producto de cada pedido ───────────────────────
+lineas as (
+    select
+        pps.pedido_producto_sabor_id,
+        pp.pedido_id,
+        pp.pedido_producto_id,
+        pp.producto_id,
+        pps.sabor_id,
+        pr.nombre as producto_nombre,
+        pr.peso_kg,
+        pr.precio_base,
+        -- Contar cuántos sabores tiene este producto en este pedido
+        count(*) over (partition by pp.pedido_producto_id) as sabores_en_producto
+    from {{ ref('stg_pedidos_productos_sabores') }} pps
+    inner join {{ ref('stg_pedidos_productos') }} pp
+        on pps.pedido_producto_id = pp.pedido_producto_id
+    left join {{ ref('stg_productos') }} pr
+        on pp.producto_id = pr.producto_id
+),
+
+-- ── Costo por kg de cada sabor por mes (una fila por sabor y mes, para no
+-- duplicar líneas si la planilla de costos repite un sabor) ─────────────────
+costos_sabor_mes as (
+    select
+        sabor_id,
+        mes,
+        round(avg(costo_por_kg), 2)::decimal(10,2) as costo_por_kg
+    from {{ ref('stg_costos_sabores') }}
+    where tiene_match = true
+    group by sabor_id, mes
+),
+
+-- ── Costo promedio por kg por mes (fallback si el sabor no tiene costo) ─────
+indice_costos as (
+    select
+        mes,
+        avg(costo_por_kg) as avg_costo_kg
+    from {{ ref('stg_costos_sabores') }}
+    where tiene_match = true
+    group by mes
+),
+
+lineas_con_peso as (
+    select
+        l.*,
+        p.created_at,
+        p.fecha,
+        p.mes,
+        p.estado_id,
+        p.is_activo as pedido_is_activo,
+        -- kg y precio que corresponden a este sabor
+        case when l.peso_kg > 0
+            then l.peso_kg / nullif(l.sabores_en_producto, 0)
+            else 0
+        end as kg_por_sabor,
+        l.precio_base / nullif(l.sabores_en_producto, 0) as precio_por_sabor,
+        -- Estación del pedido
+        case
+            when month(p.created_at) in (12, 1, 2) then 'Verano'
+            when month(p.created_at) in (3, 4, 5)  then 'Otoño'
+            when month(p.created_at) in (6, 7, 8)  then 'Invierno'
+            when month(p.created_at) in (9, 10, 11) then 'Primavera'
+        end as estacion
+    from lineas l
+    inner join pedidos p
+        on l.pedido_id = p.pedido_id
+)
+
+select
+    lp.*,
+    cs.costo_por_kg,
+    -- Fallback: si no hay costo del sabor, usar promedio del mes
+    coalesce(cs.costo_por_kg, ic.avg_costo_kg) as costo_por_kg_usado,
+    case when cs.costo_por_kg is not null then 'exacto' else 'promedio' end as tipo_costo,
+    -- Costo de este sabor = kg × costo/kg (con fallback a promedio)
+    lp.kg_por_sabor * coalesce(cs.costo_por_kg, ic.avg_costo_kg, 0) as costo_sabor
+from lineas_con_peso lp
+left join costos_sabor_mes cs
+    on lp.sabor_id = cs.sabor_id
+    and lp.mes = cs.mes
+left join indice_costos ic
+    on lp.mes = ic.mes
+order by lp.pedido_id, lp.pedido_producto_id
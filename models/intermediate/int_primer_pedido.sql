@@ -1,12 +1,13 @@
 {{
     config(
-        materialized='view'
+        materialized='table'
     )
 }}
 
 -- ════════════════════════════════════════════════════════════════════════════
 -- int_primer_pedido: identifica el primer pedido por identidad
 -- Usa cliente_id_mail_phone de dim_mails como clave de identidad
+-- Tabla ordenada por pedido_id (la usan fct_pedidos y rpt_clientes_nuevos)
 -- ════════════════════════════════════════════════════════════════════════════
 
 with pedidos as (
@@ -57,3 +58,4 @@ select
     pf.fecha_primer_pedido
 from pedidos_con_identidad pc
 inner join primer_fechas pf on pc.cliente_id_mail_phone = pf.cliente_id_mail_phone
+order by pc.pedido_id
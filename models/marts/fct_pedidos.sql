@@ -1,11 +1,82 @@
 {{
     config(
-        materialized='table'
+        materialized='incremental',
+        unique_key='pedido_id',
+        incremental_strategy='delete+insert',
+        on_schema_change='append_new_columns',
+        post_hook="delete from {{ this }} where pedido_id not in (select pedido_id from {{ ref('stg_pedidos') }})"
     )
 }}
 
-with pedidos as (
+-- depends_on: {{ ref('stg_pedidos_productos_sabores') }}
+
+-- ════════════════════════════════════════════════════════════════════════════
+-- fct_pedidos: incremental por pedido_id. Cada corrida recalcula solo:
+--   1. Pedidos (o sus productos, sabores, cliente o dirección) creados/modificados desde
+--      fct_pedidos_lookback_days antes del último updated_at cargado
+--   2. Pedidos cuya identidad (dim_mails) o flag de primer pedido ya no
+--      coincide con lo guardado: cambian por pedidos/clientes de otro lado
+-- Si cambian costos_sabores o dolar_blue hacia atrás: dbt run --full-refresh -s fct_pedidos
+-- ════════════════════════════════════════════════════════════════════════════
+
+{% if is_incremental() %}
+{% set cutoff %}
+    (select max(updated_at) from {{ this }}) - interval '{{ var("fct_pedidos_lookback_days") }} days'
+{% endset %}
+{% endif %}
+
+with
+
+{% if is_incremental() %}
+pedidos_a_procesar as (
+    select pedido_id
+    from {{ ref('stg_pedidos') }}
+    where coalesce(updated_at, created_at) >= {{ cutoff }}
+
+    union
+
+    select pedido_id
+    from {{ ref('stg_pedidos_productos') }}
+    where coalesce(updated_at, created_at) >= {{ cutoff }}
+
+    union
+
+    -- Sabores: cantidad_sabores y costos (int_lineas_sabor, int_costos_pedido)
+    select pp.pedido_id
+    from {{ ref('stg_pedidos_productos_sabores') }} pps
+    inner join {{ ref('stg_pedidos_productos') }} pp on pps.pedido_producto_id = pp.pedido_producto_id
+    where coalesce(pps.updated_at, pps.created_at) >= {{ cutoff }}
+
+    union
+
+    select p.pedido_id
+    from {{ ref('stg_pedidos') }} p
+    inner join {{ ref('stg_clientes') }} c on p.cliente_id = c.cliente_id
+    where coalesce(c.updated_at, c.created_at) >= {{ cutoff }}
+
+    union
+
+    select p.pedido_id
+    from {{ ref('stg_pedidos') }} p
+    inner join {{ ref('stg_clientes_direcciones') }} d on p.direccion_id = d.direccion_id
+    where coalesce(d.updated_at, d.created_at) >= {{ cutoff }}
+
+    union
+
+    select t.pedido_id
+    from {{ this }} t
+    left join {{ ref('dim_mails') }} m on t.cliente_id = m.cliente_id
+    left join {{ ref('int_primer_pedido') }} ip on t.pedido_id = ip.pedido_id
+    where t.cliente_id_mail_phone is distinct from m.cliente_id_mail_phone
+       or t.is_primer_pedido != coalesce(ip.is_primer_pedido, false)
+),
+{% endif %}
+
+pedidos as (
     select * from {{ ref('stg_pedidos') }}
+    {% if is_incremental() %}
+    where pedido_id in (select pedido_id from pedidos_a_procesar)
+    {% endif %}
 ),
 
 clientes as (
@@ -26,18 +97,22 @@ productos_por_pedido as (
         pedido_id,
         count(*) as cantidad_productos
     from {{ ref('stg_pedidos_productos') }}
+    {% if is_incremental() %}
+    where pedido_id in (select pedido_id from pedidos)
+    {% endif %}
     group by pedido_id
 ),
 
 -- Contar sabores por pedido
 sabores_por_pedido as (
     select
-        pp.pedido_id,
-        count(distinct pps.sabor_id) as cantidad_sabores
-    from {{ ref('stg_pedidos_productos') }} pp
-    left join {{ ref('stg_pedidos_productos_sabores') }} pps
-        on pp.pedido_producto_id = pps.pedido_producto_id
-    group by pp.pedido_id
+        pedido_id,
+        count(distinct sabor_id) as cantidad_sabores
+    from {{ ref('int_lineas_sabor') }}
+    {% if is_incremental() %}
+    where pedido_id in (select pedido_id from pedidos)
+    {% endif %}
+    group by pedido_id
 ),
 
 -- Sumar kg por pedido (peso_kg por producto × cantidad de items)
@@ -47,17 +122,18 @@ kg_por_pedido as (
         sum(pr.peso_kg) as kg_total
     from {{ ref('stg_pedidos_productos') }} pp
     join {{ ref('stg_productos') }} pr on pp.producto_id = pr.producto_id
+    {% if is_incremental() %}
+    where pp.pedido_id in (select pedido_id from pedidos)
+    {% endif %}
     group by pp.pedido_id
 ),
 
 -- Costos por pedido
 costos as (
     select * from {{ ref('int_costos_pedido') }}
-),
-
--- Dolar blue
-dolar as (
-    select * from {{ ref('stg_dolar_blue') }}
+    {% if is_incremental() %}
+    where pedido_id in (select pedido_id from pedidos)
+    {% endif %}
 ),
 
 -- Primer pedido flag
@@ -91,6 +167,7 @@ select
     
     -- Fechas
     p.created_at,
+    coalesce(p.updated_at, p.created_at) as updated_at,
     date_trunc('day', p.created_at) as fecha,
     date_trunc('week', p.created_at) as semana,
     date_trunc('month', p.created_at) as mes,
@@ -179,7 +256,7 @@ select
     -- Primer pedido
     coalesce(ppf.is_primer_pedido, false) as is_primer_pedido,
 
-    -- USD (tipo de cambio blue del día)
+    -- USD (cotización blue vigente al momento del pedido)
     round(p.total / nullif(db.valor_blue, 0), 2) as total_usd,
     round(coalesce(cs.costo_total, 0) / nullif(db.valor_blue, 0), 2) as costo_total_usd,
     round((p.total - coalesce(cs.costo_total, 0)) / nullif(db.valor_blue, 0), 2) as contribucion_mg_usd,
@@ -196,7 +273,7 @@ left join productos_por_pedido pp on p.pedido_id = pp.pedido_id
 left join sabores_por_pedido sp on p.pedido_id = sp.pedido_id
 left join kg_por_pedido kp on p.pedido_id = kp.pedido_id
 left join costos cs on p.pedido_id = cs.pedido_id
-left join dolar db on cast(p.created_at as date) = db.fecha
+{{ asof_join_dolar_blue('p.created_at') }}
 left join primer_pedido ppf on p.pedido_id = ppf.pedido_id
 left join mails m on p.cliente_id = m.cliente_id
 --where p.is_activo = 1
\ No newline at end of file
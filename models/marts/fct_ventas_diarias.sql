@@ -18,10 +18,6 @@ clima as (
     select * from {{ ref('int_clima') }}
 ),
 
-dolar as (
-    select * from {{ ref('stg_dolar_blue') }}
-),
-
 -- Detalles del sistema (breakdowns que solo vienen de fct_pedidos)
 sistema_detalle as (
     select
@@ -153,6 +149,6 @@ select
 
 from ventas_base vb
 left join clima cl on cast(vb.fecha as date) = cl.fecha
-left join dolar db on cast(vb.fecha as date) = db.fecha
+{{ asof_join_dolar_blue('vb.fecha') }}
 left join sistema_detalle sd on vb.fecha = sd.fecha
 order by vb.fecha desc
@@ -0,0 +1,27 @@
+{{
+    config(
+        materialized='table'
+    )
+}}
+
+-- ════════════════════════════════════════════════════════════════════════════
+-- rpt_cubo_ventas: pedidos pre-agregados por día para los KPIs de 03_Pedidos
+-- Una fila por fecha × tipo_retiro × tipo_pago × estado_nombre (los filtros
+-- de la página). Semana/mes y zona no se materializan: nadie los lee
+-- Medidas aditivas: pedidos, kg, venta, venta_usd, costo (cualquier rango de
+-- fechas y selección de filtros se obtiene sumando filas)
+-- ════════════════════════════════════════════════════════════════════════════
+
+select
+    cast(fecha as date) as fecha,
+    coalesce(tipo_retiro, 'Sin dato') as tipo_retiro,
+    coalesce(tipo_pago, 'Sin dato') as tipo_pago,
+    estado_nombre,
+    count(*) as pedidos,
+    round(sum(kg_total), 2) as kg,
+    round(sum(total), 2) as venta,
+    round(sum(total_usd), 2) as venta_usd,
+    round(sum(costo_total), 2) as costo
+from {{ ref('fct_pedidos') }}
+group by all
+order by fecha
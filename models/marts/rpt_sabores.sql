@@ -9,41 +9,12 @@
 -- Reemplaza rpt_sabores_populares
 -- ════════════════════════════════════════════════════════════════════════════
 
-with pedidos_entregados as (
-    select pedido_id, created_at
-    from {{ ref('stg_pedidos') }}
+-- Cada línea sabor de pedidos entregados, con su peso y estación
+with lineas_sabor as (
+    select sabor_id, pedido_id, kg_por_sabor, estacion
+    from {{ ref('int_lineas_sabor') }}
     where estado_id = 3
-),
-
--- Cada línea sabor con su peso
-lineas_sabor as (
-    select
-        pps.sabor_id,
-        pp.pedido_id,
-        pp.producto_id,
-        pr.peso_kg,
-        pr.nombre as producto_nombre,
-        pr.precio_base,
-        pe.created_at,
-        -- kg por sabor = peso / cantidad de sabores en el producto
-        pr.peso_kg / nullif(
-            count(*) over (partition by pp.pedido_producto_id), 0
-        ) as kg_por_sabor,
-        -- Estación del pedido
-        case
-            when month(pe.created_at) in (12, 1, 2) then 'Verano'
-            when month(pe.created_at) in (3, 4, 5)  then 'Otoño'
-            when month(pe.created_at) in (6, 7, 8)  then 'Invierno'
-            when month(pe.created_at) in (9, 10, 11) then 'Primavera'
-        end as estacion
-    from {{ ref('stg_pedidos_productos_sabores') }} pps
-    inner join {{ ref('stg_pedidos_productos') }} pp
-        on pps.pedido_producto_id = pp.pedido_producto_id
-    inner join {{ ref('stg_productos') }} pr
-        on pp.producto_id = pr.producto_id
-    inner join pedidos_entregados pe
-        on pp.pedido_id = pe.pedido_id
-    where pr.peso_kg > 0
+      and peso_kg > 0
 ),
 
 -- Costo promedio global por sabor
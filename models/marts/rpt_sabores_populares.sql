@@ -6,15 +6,11 @@
 
 with sabores_pedidos as (
     select
-        pps.sabor_id,
-        pp.pedido_id
-    from {{ ref('stg_pedidos_productos_sabores') }} pps
-    inner join {{ ref('stg_pedidos_productos') }} pp 
-        on pps.pedido_producto_id = pp.pedido_producto_id
-    inner join {{ ref('stg_pedidos') }} p 
-        on pp.pedido_id = p.pedido_id
-    where p.is_activo = 1
-      and p.estado_id = 3  -- Entregados
+        sabor_id,
+        pedido_id
+    from {{ ref('int_lineas_sabor') }}
+    where pedido_is_activo = 1
+      and estado_id = 3  -- Entregados
 ),
 
 sabores as (
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Benchmark del pipeline con dumps sintéticos: carga (load_data.py), dbt run y
+export a parquet, a distintas escalas. Registra tiempo, pico de RSS y filas/s
+en un CSV y avisa si una etapa quedó más lenta que en la corrida anterior.
+Uso: python scripts/benchmark.py [--scales 1,10,100] [--stages load,dbt,export]
+     [--mode sql|arrow] [--workers N] [--workdir DIR] [--results CSV] [--threshold 0.2]
+
+Todo corre sobre una copia del proyecto en --workdir, así que no toca
+ainara.duckdb ni dashboard/data del repo.
+"""
+
+import argparse
+import csv
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import duckdb
+
+PROJECT_ROOT = Path(__file__).parent.parent
+RESULTS_PATH = PROJECT_ROOT / 'benchmarks' / 'results.csv'
+# Lo mínimo del proyecto para correr las tres etapas en otra carpeta
+PROJECT_FILES = ['scripts', 'models', 'macros', 'seeds', 'dbt_project.yml', 'profiles.yml', 'packages.yml',
+                 'dashboard/schema.py']
+STAGES = ['load', 'dbt', 'export']
+RESULT_FIELDS = ['fecha', 'commit', 'escala', 'modo', 'workers', 'etapa', 'segundos', 'pico_rss_mb', 'filas', 'filas_por_s', 'ok']
+
+
+def run_measured(cmd, cwd, log_path):
+    """Corre un comando y devuelve (returncode, segundos, pico de RSS en MB) del proceso hijo"""
+    with open(log_path, 'w') as log:
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(cmd, cwd=cwd, stdout=log, stderr=subprocess.STDOUT)
+        # wait4 da el rusage de este hijo solo (RUSAGE_CHILDREN acumula el máximo de todos)
+        _, status, rusage = os.wait4(proc.pid, 0)
+        elapsed = time.perf_counter() - t0
+    # ru_maxrss: KB en Linux, bytes en macOS
+    rss_mb = rusage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+    return os.waitstatus_to_exitcode(status), elapsed, rss_mb
+
+
+def count_rows(db_path, schema):
+    """Filas totales de las tablas de un schema"""
+    conn = duckdb.connect(str(db_path), read_only=True)
+    try:
+        tables = conn.execute(
+            "SELECT table_name FROM information_schema.tables WHERE table_schema = ? AND table_type = 'BASE TABLE'",
+            [schema]).fetchall()
+        return sum(conn.execute(f'SELECT COUNT(*) FROM {schema}."{t}"').fetchone()[0] for (t,) in tables)
+    finally:
+        conn.close()
+
+
+def count_parquet_rows(out_dir):
+    out_dir = Path(out_dir)
+    # Solo el snapshot vigente: los anteriores que se conservan no son de esta corrida
+    current = out_dir / 'CURRENT'
+    if current.exists():
+        out_dir = out_dir / 'snapshots' / current.read_text().strip()
+    files = list(out_dir.rglob('*.parquet'))
+    if not files:
+        return 0
+    return duckdb.sql(f"SELECT COUNT(*) FROM read_parquet({[str(f) for f in files]})").fetchone()[0]
+
+
+def prepare_workdir(workdir):
+    """Copia del proyecto donde corren las etapas (los scripts usan rutas relativas a sí mismos)"""
+    project = workdir / 'project'
+    if project.exists():
+        shutil.rmtree(project)
+    project.mkdir(parents=True)
+    for name in PROJECT_FILES:
+        src = PROJECT_ROOT / name
+        if src.is_dir():
+            shutil.copytree(src, project / name, ignore=shutil.ignore_patterns('__pycache__'))
+        elif src.exists():
+            (project / name).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(src, project / name)
+    return project
+
+
+def generate_dump(workdir, scale):
+    """Dump sintético de la escala pedida, reutilizado entre corridas"""
+    dump = workdir / 'dumps' / f'dump_x{scale:g}.sql'
+    if not dump.exists():
+        dump.parent.mkdir(parents=True, exist_ok=True)
+        print(f"  🏭 Generando dump x{scale:g}...")
+        subprocess.run([sys.executable, str(PROJECT_ROOT / 'scripts' / 'generate_dump.py'), str(dump),
+                        '--scale', str(scale)], check=True, stdout=subprocess.DEVNULL)
+    return dump
+
+
+def stage_command(stage, project, dump, args):
+    if stage == 'load':
+        return [sys.executable, 'scripts/load_data.py', str(dump), '--mode', args.mode,
+                '--workers', str(args.workers)]
+    if stage == 'dbt':
+        return ['dbt', 'run', '--project-dir', str(project), '--profiles-dir', str(project)]
+    return [sys.executable, 'scripts/export_parquet.py']
+
+
+def stage_rows(stage, project):
+    db_path = project / 'ainara.duckdb'
+    if stage == 'load':
+        return count_rows(db_path, 'raw')
+    if stage == 'dbt':
+        return count_rows(db_path, 'main')
+    return count_parquet_rows(project / 'dashboard' / 'data')
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def previous_results(results_path):
+    """Última medición exitosa por (escala, modo, workers, etapa)"""
+    previous = {}
+    if results_path.exists():
+        with open(results_path, newline='') as f:
+            for row in csv.DictReader(f):
+                if row['ok'] == '1':
+                    previous[(float(row['escala']), row['modo'], int(row['workers']), row['etapa'])] = row
+    return previous
+
+
+def append_results(results_path, rows):
+    results_path.parent.mkdir(parents=True, exist_ok=True)
+    new_file = not results_path.exists()
+    with open(results_path, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        if new_file:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de carga, dbt run y export con dumps sintéticos")
+    parser.add_argument('--scales', default='1,10', help="escalas separadas por coma (default: 1,10)")
+    parser.add_argument('--stages', default=','.join(STAGES), help="etapas a medir (default: load,dbt,export)")
+    parser.add_argument('--mode', choices=['sql', 'arrow'], default='arrow', help="modo de load_data.py")
+    parser.add_argument('--workers', type=int, default=1, help="--workers de load_data.py")
+    parser.add_argument('--workdir', help="carpeta de trabajo (default: una temporal); los dumps se reutilizan")
+    parser.add_argument('--results', default=str(RESULTS_PATH), help=f"CSV de resultados (default: {RESULTS_PATH})")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="fracción de tiempo extra que cuenta como regresión (default: 0.2)")
+    args = parser.parse_args()
+
+    scales = [float(s) for s in args.scales.split(',')]
+    stages = [s for s in args.stages.split(',') if s]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"etapas desconocidas: {', '.join(sorted(unknown))}")
+    if 'dbt' in stages and shutil.which('dbt') is None:
+        print("⚠️  dbt no está instalado: se saltea la etapa dbt")
+        stages.remove('dbt')
+
+    workdir = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp(prefix='ainara_bench_'))
+    results_path = Path(args.results)
+    previous = previous_results(results_path)
+    commit = git_commit()
+    print(f"📂 Carpeta de trabajo: {workdir}")
+
+    results, regressions = [], []
+    for scale in scales:
+        print(f"\n📏 Escala x{scale:g}")
+        dump = generate_dump(workdir, scale)
+        project = prepare_workdir(workdir)
+        for stage in stages:
+            log_path = workdir / f'{stage}_x{scale:g}.log'
+            returncode, elapsed, rss_mb = run_measured(stage_command(stage, project, dump, args), project, log_path)
+            ok = returncode == 0
+            rows = stage_rows(stage, project) if ok else 0
+            rate = rows / elapsed if elapsed > 0 else 0
+            results.append({
+                'fecha': datetime.now().isoformat(timespec='seconds'), 'commit': commit, 'escala': f'{scale:g}',
+                'modo': args.mode, 'workers': args.workers, 'etapa': stage, 'segundos': f'{elapsed:.2f}', 'pico_rss_mb': f'{rss_mb:.0f}', 'filas': rows,
+                'filas_por_s': f'{rate:.0f}', 'ok': int(ok),
+            })
+            if not ok:
+                print(f"  ❌ {stage}: falló (código {returncode}), ver {log_path}")
+                break
+            line = f"  ✅ {stage}: {elapsed:.1f}s, {rss_mb:,.0f} MB pico, {rows:,} filas ({rate:,.0f} filas/s)"
+            prev = previous.get((scale, args.mode, args.workers, stage))
+            if prev:
+                change = elapsed / float(prev['segundos']) - 1 if float(prev['segundos']) > 0 else 0
+                line += f" [{change:+.0%} vs {prev['commit'] or prev['fecha']}]"
+                if change > args.threshold:
+                    regressions.append(f"{stage} x{scale:g}: {change:+.0%}")
+            print(line)
+
+    append_results(results_path, results)
+    print(f"\n📝 Resultados en {results_path}")
+    if regressions:
+        print(f"⚠️  Regresiones (> {args.threshold:.0%} más lento): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
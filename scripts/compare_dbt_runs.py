@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Compara los tiempos de dos corridas de dbt a partir de sus run_results.json
+Uso: python scripts/compare_dbt_runs.py antes.json [despues.json] [--top N]
+
+despues.json por defecto es target/run_results.json (la última corrida).
+Flujo típico:
+    dbt run && cp target/run_results.json antes.json
+    # ...cambio de materializaciones...
+    dbt run && python scripts/compare_dbt_runs.py antes.json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def load_timings(path):
+    """(tiempo total de la corrida, {modelo: segundos}) de un run_results.json"""
+    with open(path) as f:
+        results = json.load(f)
+    timings = {r['unique_id'].split('.')[-1]: r['execution_time']
+               for r in results['results'] if r['status'] == 'success'}
+    return results.get('elapsed_time', sum(timings.values())), timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara tiempos de dos run_results.json de dbt")
+    parser.add_argument('antes', help="run_results.json de la corrida de referencia")
+    parser.add_argument('despues', nargs='?', default=str(PROJECT_ROOT / 'target' / 'run_results.json'),
+                        help="run_results.json a comparar (default: target/run_results.json)")
+    parser.add_argument('--top', type=int, default=15, help="modelos a mostrar, los de mayor diferencia (default: 15)")
+    args = parser.parse_args()
+
+    for path in (args.antes, args.despues):
+        if not Path(path).exists():
+            print(f"❌ No existe: {path}")
+            sys.exit(1)
+
+    total_antes, antes = load_timings(args.antes)
+    total_despues, despues = load_timings(args.despues)
+    modelos = sorted(set(antes) | set(despues),
+                     key=lambda m: abs(antes.get(m, 0) - despues.get(m, 0)), reverse=True)
+
+    print(f"{'modelo':<32} {'antes':>8} {'después':>8} {'dif':>8}")
+    for m in modelos[:args.top]:
+        a, d = antes.get(m), despues.get(m)
+        fmt = lambda v: f"{v:7.2f}s" if v is not None else f"{'-':>8}"
+        dif = f"{d - a:+7.2f}s" if a is not None and d is not None else f"{'':>8}"
+        print(f"{m:<32} {fmt(a)} {fmt(d)} {dif}")
+
+    speedup = total_antes / total_despues if total_despues > 0 else 0
+    print(f"\n⏱️  Total: {total_antes:.1f}s → {total_despues:.1f}s ({speedup:.2f}x)")
+    # Con threads > 1 el total es tiempo de pared; la suma por modelo mide el trabajo real
+    suma_antes, suma_despues = sum(antes.values()), sum(despues.values())
+    print(f"   Suma por modelo: {suma_antes:.1f}s → {suma_despues:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,62 +1,164 @@
 #!/usr/bin/env python3
 """
 Exporta marts de DuckDB a Excel
-Uso: python scripts/export_marts.py
+Uso: python scripts/export_marts.py [--workers N] [--batch-size N] [--single-workbook]
+
+Las filas van de DuckDB al workbook en lotes (openpyxl en modo write-only,
+sin armar la hoja entera en memoria). Una tabla con más filas de las que
+entran en una hoja de Excel se parte en <tabla>, <tabla>_2, ...
+Por defecto un archivo por tabla, generados en paralelo (un proceso por
+tabla); --single-workbook escribe todas las tablas como hojas de un solo
+archivo (un único escritor, sin paralelismo).
 """
 
-import duckdb
-import pandas as pd
-from pathlib import Path
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
+from pathlib import Path
+
+import duckdb
+from openpyxl import Workbook
 
 PROJECT_ROOT = Path(__file__).parent.parent
 DB_PATH = PROJECT_ROOT / 'ainara.duckdb'
 OUTPUT_DIR = PROJECT_ROOT / 'marts_output'
 
-def clean_dataframe(df):
-    """Limpia el dataframe para que sea compatible con Excel"""
-    for col in df.columns:
-        # Convertir columnas datetime con timezone a sin timezone
-        if pd.api.types.is_datetime64_any_dtype(df[col]):
-            df[col] = pd.to_datetime(df[col]).dt.tz_localize(None)
-    return df
+# Límite de Excel: 1.048.576 filas por hoja, una es el encabezado
+EXCEL_MAX_ROWS = 1_048_576
+SHEET_TITLE_MAX = 31
+# Tipos que openpyxl escribe tal cual; el resto (listas, structs, UUID...) va como texto
+EXCEL_TYPES = ('BOOLEAN', 'TINYINT', 'SMALLINT', 'INTEGER', 'BIGINT', 'HUGEINT', 'UTINYINT', 'USMALLINT',
+               'UINTEGER', 'UBIGINT', 'FLOAT', 'DOUBLE', 'DATE', 'TIMESTAMP', 'TIME', 'INTERVAL', 'VARCHAR')
+
+
+def select_sql(conn, table):
+    """SELECT de una tabla con columnas que Excel acepta: timestamps con zona
+    horaria a hora local sin zona (Excel no soporta zonas horarias)"""
+    columns = conn.execute(
+        "SELECT column_name, data_type FROM information_schema.columns "
+        "WHERE table_schema = 'main' AND table_name = ? ORDER BY ordinal_position", [table]).fetchall()
+    exprs = []
+    for name, dtype in columns:
+        if dtype == 'TIMESTAMP WITH TIME ZONE':
+            exprs.append(f'CAST("{name}" AS TIMESTAMP) AS "{name}"')
+        elif dtype in EXCEL_TYPES or dtype.startswith('DECIMAL'):
+            exprs.append(f'"{name}"')
+        else:
+            exprs.append(f'CAST("{name}" AS VARCHAR) AS "{name}"')
+    return f'SELECT {", ".join(exprs)} FROM main."{table}"'
+
+
+def sheet_title(table, part):
+    """Nombre de hoja (máx. 31 caracteres): <tabla>, <tabla>_2, <tabla>_3..."""
+    suffix = f"_{part}" if part > 1 else ''
+    return table[:SHEET_TITLE_MAX - len(suffix)] + suffix
+
+
+def write_table(wb, conn, table, batch_size):
+    """Escribe una tabla en hojas nuevas de un workbook write-only, en lotes.
+    Devuelve (filas, hojas)"""
+    cursor = conn.execute(select_sql(conn, table))
+    header = [d[0] for d in cursor.description]
+    rows, sheets, ws, free = 0, 0, None, 0
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            break
+        for row in batch:
+            if free == 0:
+                sheets += 1
+                ws = wb.create_sheet(sheet_title(table, sheets))
+                ws.append(header)
+                free = EXCEL_MAX_ROWS - 1
+            ws.append(row)
+            free -= 1
+        rows += len(batch)
+    if sheets == 0:
+        # Tabla vacía: la hoja igual existe, con el encabezado
+        sheets = 1
+        wb.create_sheet(sheet_title(table, 1)).append(header)
+    return rows, sheets
+
+
+def export_workbook(tables, filepath, batch_size):
+    """Un workbook con una o más tablas. Corre en un proceso aparte, con su
+    propia conexión read-only. Devuelve {tabla: (filas, hojas)} y segundos"""
+    t0 = time.perf_counter()
+    conn = duckdb.connect(str(DB_PATH), read_only=True)
+    try:
+        wb = Workbook(write_only=True)
+        result = {table: write_table(wb, conn, table, batch_size) for table in tables}
+        wb.save(filepath)
+    finally:
+        conn.close()
+    return result, time.perf_counter() - t0
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Exporta marts de DuckDB a Excel")
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1),
+                        help="workbooks generados en paralelo (default: min(4, CPUs))")
+    parser.add_argument('--batch-size', type=int, default=50_000,
+                        help="filas por lote leído de DuckDB (default: 50000)")
+    parser.add_argument('--single-workbook', action='store_true',
+                        help="un solo archivo con una hoja por tabla en vez de un archivo por tabla")
+    args = parser.parse_args()
+
     if not DB_PATH.exists():
         print(f"❌ No existe: {DB_PATH}")
         return
-    
+
     OUTPUT_DIR.mkdir(exist_ok=True)
     conn = duckdb.connect(str(DB_PATH), read_only=True)
-    
-    tables = conn.execute("""
-        SELECT table_name 
-        FROM information_schema.tables 
-        WHERE table_schema = 'main'
-        AND table_name NOT LIKE 'stg_%'
-    """).fetchall()
-    
+    # Las más grandes primero: reparten mejor la carga entre procesos
+    tables = [t for (t,) in conn.execute("""
+        SELECT t.table_name
+        FROM information_schema.tables t
+        LEFT JOIN duckdb_tables() d
+            ON d.schema_name = t.table_schema AND d.table_name = t.table_name
+        WHERE t.table_schema = 'main'
+        AND t.table_name NOT LIKE 'stg_%'
+        ORDER BY coalesce(d.estimated_size, 0) DESC, t.table_name
+    """).fetchall()]
+    conn.close()
+
     if not tables:
         print("⚠️  No hay marts. Corré: dbt run")
         return
-    
+
     print(f"📊 Exportando {len(tables)} marts...\n")
-    
+
     timestamp = datetime.now().strftime('%Y%m%d')
-    
-    for (table,) in tables:
+    t0 = time.perf_counter()
+
+    if args.single_workbook:
+        filename = f"marts_{timestamp}.xlsx"
         try:
-            df = conn.execute(f'SELECT * FROM main."{table}"').df()
-            df = clean_dataframe(df)
-            filename = f"{table}_{timestamp}.xlsx"
-            filepath = OUTPUT_DIR / filename
-            df.to_excel(filepath, index=False)
-            print(f"  ✅ {table}: {len(df):,} filas → {filename}")
+            result, seconds = export_workbook(sorted(tables), OUTPUT_DIR / filename, args.batch_size)
+            for table, (rows, sheets) in result.items():
+                hojas = f" en {sheets} hojas" if sheets > 1 else ''
+                print(f"  ✅ {table}: {rows:,} filas{hojas}")
+            print(f"\n  📗 {filename}: {len(result)} tablas en {seconds:.1f}s")
         except Exception as e:
-            print(f"  ❌ {table}: {e}")
-    
-    conn.close()
-    print(f"\n📁 Archivos en: {OUTPUT_DIR}")
+            print(f"  ❌ {filename}: {e}")
+    else:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = {pool.submit(export_workbook, [table], OUTPUT_DIR / f"{table}_{timestamp}.xlsx",
+                                   args.batch_size): table
+                       for table in tables}
+            for future in as_completed(futures):
+                table = futures[future]
+                try:
+                    result, seconds = future.result()
+                    rows, sheets = result[table]
+                    hojas = f" en {sheets} hojas" if sheets > 1 else ''
+                    print(f"  ✅ {table}: {rows:,} filas{hojas} → {table}_{timestamp}.xlsx ({seconds:.1f}s)")
+                except Exception as e:
+                    print(f"  ❌ {table}: {e}")
+
+    print(f"\n📁 Archivos en: {OUTPUT_DIR} ({time.perf_counter() - t0:.1f}s)")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,9 +1,38 @@
-"""Export DuckDB mart tables to parquet files for Streamlit Cloud deployment."""
+"""Export DuckDB mart tables to parquet files for Streamlit Cloud deployment.
+
+Rows stream from DuckDB as Arrow record batches straight into the parquet
+writer (no pandas round-trip), and tables are exported in parallel.
+Each export is a new snapshot directory made current with an atomic pointer
+swap; marts whose content fingerprint matches the current snapshot's
+manifest.json are hard-linked instead of rewritten.
+Usage: python scripts/export_parquet.py [--compression zstd] [--row-group-size N] [--workers N]
+       [--force] [--keep N] [--remove-legacy]
+"""
+import argparse
+import hashlib
+import json
 import os
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
 import duckdb
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "dashboard"))
+from schema import TABLE_DTYPES, arrow_schema  # noqa: E402  (dtypes shared with data.py)
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "..", "ainara.duckdb")
 OUT_DIR = os.path.join(os.path.dirname(__file__), "..", "dashboard", "data")
+# Each export writes an immutable snapshot to snapshots/<YYYYmmdd-HHMMSS>/ and
+# then moves the CURRENT pointer (os.replace, atomic) to the new snapshot
+SNAPSHOTS_DIR = os.path.join(OUT_DIR, "snapshots")
+CURRENT_PATH = os.path.join(OUT_DIR, "CURRENT")
+MANIFEST_NAME = "manifest.json"
 
 TABLES = [
     "fct_ventas_diarias",
@@ -19,20 +48,280 @@ TABLES = [
     "rpt_puntos",
     "rpt_zonas",
     "rpt_clientes_nuevos",
+    "rpt_cubo_ventas",
 ]
 
-os.makedirs(OUT_DIR, exist_ok=True)
+# Time-series marts written as Hive partitions by month
+# (<table>/anio_mes=YYYY-MM/*.parquet) so the dashboard only opens the months
+# in the requested range. Value: date column anio_mes is derived from
+# Only marts with many rows per month: with one row per day or per month
+# (fct_ventas_diarias, rpt_pnl, rpt_margenes...) each file is mostly header
+# and metadata, and a single file is ~10x smaller
+PARTITIONED = {
+    "fct_pedidos": "fecha",
+}
+PARTITION_COL = "anio_mes"
+# Date column of each time-series mart: its min/max go into the manifest
+DATE_COLUMNS = {
+    "fct_pedidos": "fecha",
+    "fct_ventas_diarias": "fecha",
+    "rpt_pnl": "mes",
+    "rpt_margenes": "mes",
+    "rpt_cash_flow": "mes",
+    "rpt_egresos": "mes",
+    "rpt_clientes_nuevos": "mes",
+    "rpt_cubo_ventas": "fecha",
+}
+# Compact integers from schema.TABLE_DTYPES: DuckDB's CAST fails on a value
+# that doesn't fit instead of truncating it
+SQL_INT_TYPES = {"int8": "TINYINT", "int16": "SMALLINT", "int32": "INTEGER",
+                 "Int8": "TINYINT", "Int16": "SMALLINT", "Int32": "INTEGER"}
+
+
+def table_columns(conn, table):
+    return conn.execute(
+        "SELECT column_name, data_type FROM information_schema.columns "
+        "WHERE table_schema = 'main' AND table_name = ? ORDER BY ordinal_position", [table]).fetchall()
+
+
+def select_sql(conn, table):
+    """SELECT of a mart with the dtypes the dashboard got from .df(): DECIMAL and
+    HUGEINT as DOUBLE, DATE as TIMESTAMP (pandas reads Arrow decimals and dates
+    as Python objects), and the compact integers of schema.TABLE_DTYPES"""
+    dtypes = TABLE_DTYPES.get(table, {})
+    exprs = []
+    for name, dtype in table_columns(conn, table):
+        if dtypes.get(name) in SQL_INT_TYPES:
+            exprs.append(f'CAST("{name}" AS {SQL_INT_TYPES[dtypes[name]]}) AS "{name}"')
+        elif dtype.startswith("DECIMAL") or dtype == "HUGEINT":
+            exprs.append(f'CAST("{name}" AS DOUBLE) AS "{name}"')
+        elif dtype == "DATE":
+            exprs.append(f'CAST("{name}" AS TIMESTAMP) AS "{name}"')
+        else:
+            exprs.append(f'"{name}"')
+    if table in PARTITIONED:
+        # Month in the session time zone (the one timestamptz values are exported in)
+        exprs.append(f'strftime("{PARTITIONED[table]}", \'%Y-%m\') AS {PARTITION_COL}')
+    return f'SELECT {", ".join(exprs)} FROM main."{table}"'
+
+
+def table_summary(conn, table, options):
+    """Fingerprint of a mart (schema + row count + order-independent sum of row
+    hashes + export options + dtype schema) and the metadata recorded in the manifest"""
+    columns = table_columns(conn, table)
+    if not columns:
+        raise ValueError("table not found, run dbt first")
+    date_col = DATE_COLUMNS.get(table)
+    date_range = f', min("{date_col}")::VARCHAR, max("{date_col}")::VARCHAR' if date_col else ''
+    row = conn.execute(f'SELECT count(*), sum(hash(t)::HUGEINT)::VARCHAR{date_range} FROM main."{table}" t').fetchone()
+    rows, row_hash = row[0], row[1]
+    fingerprint = hashlib.blake2b(
+        json.dumps([columns, rows, row_hash, options, TABLE_DTYPES.get(table)]).encode(), digest_size=16).hexdigest()
+    return {
+        "fingerprint": fingerprint,
+        "rows": rows,
+        "schema": dict(columns),
+        "date_column": date_col,
+        "min_date": row[2] if date_col else None,
+        "max_date": row[3] if date_col else None,
+        **options,
+    }
+
 
-conn = duckdb.connect(DB_PATH, read_only=True)
+def current_snapshot():
+    """Snapshot name the CURRENT pointer refers to, or None (flat legacy layout)"""
+    if not os.path.exists(CURRENT_PATH):
+        return None
+    with open(CURRENT_PATH) as f:
+        name = f.read().strip()
+    return name if os.path.isdir(os.path.join(SNAPSHOTS_DIR, name)) else None
 
-for table in TABLES:
+
+def load_manifest(snapshot_dir):
+    path = os.path.join(snapshot_dir, MANIFEST_NAME) if snapshot_dir else None
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get("tables", {})
+
+
+def output_name(table):
+    return table if table in PARTITIONED else f"{table}.parquet"
+
+
+def dir_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+
+def link_output(src, dst):
+    """Reuse an unchanged mart from the previous snapshot: hard links, no copies"""
+    if os.path.isfile(src):
+        os.link(src, dst)
+    else:
+        shutil.copytree(src, dst, copy_function=os.link)
+
+
+def export_table(conn, table, options, previous, previous_dir, snapshot_dir, force):
+    """Write one mart into the new snapshot, or link it from the previous one
+    if its fingerprint matches. Returns (manifest entry, skipped, seconds)"""
+    t0 = time.perf_counter()
+    cursor = conn.cursor()  # one cursor per thread
     try:
-        df = conn.execute(f'SELECT * FROM main."{table}"').df()
-        out = os.path.join(OUT_DIR, f"{table}.parquet")
-        df.to_parquet(out, index=False)
-        print(f"  {table}: {len(df)} rows -> {out}")
-    except Exception as e:
-        print(f"  {table}: ERROR - {e}")
-
-conn.close()
-print("\nDone!")
+        entry = table_summary(cursor, table, options)
+        out = os.path.join(snapshot_dir, output_name(table))
+        if (not force and previous and previous["fingerprint"] == entry["fingerprint"]
+                and os.path.exists(os.path.join(previous_dir, output_name(table)))):
+            link_output(os.path.join(previous_dir, output_name(table)), out)
+            # Files come from the previous snapshot, metadata from the current summary
+            return {**previous, **entry}, True, time.perf_counter() - t0
+
+        reader = cursor.execute(select_sql(cursor, table)).to_arrow_reader(options["row_group_size"])
+        # Low-cardinality text as dictionaries: the parquet keeps the Arrow
+        # schema and pandas loads those columns as categoricals
+        schema = arrow_schema(table, reader.schema)
+        batches = (batch.cast(schema) for batch in reader)
+        if table in PARTITIONED:
+            months = set()
+
+            def tracked(batches):
+                for batch in batches:
+                    months.update(batch.column(PARTITION_COL).to_pylist())
+                    yield batch
+
+            ds.write_dataset(
+                tracked(batches), out, schema=schema, format="parquet",
+                partitioning=ds.partitioning(pa.schema([(PARTITION_COL, pa.string())]), flavor="hive"),
+                file_options=ds.ParquetFileFormat().make_write_options(compression=options["compression"]),
+                max_rows_per_group=options["row_group_size"], basename_template="part-{i}.parquet",
+            )
+            months = len(months)
+        else:
+            months = None
+            with pq.ParquetWriter(out, schema, compression=options["compression"]) as writer:
+                for batch in batches:
+                    writer.write_batch(batch, row_group_size=options["row_group_size"])
+    finally:
+        cursor.close()
+    entry.update(path=output_name(table), bytes=dir_size(out), months=months,
+                 built_at=datetime.now().isoformat(timespec="seconds"))
+    return entry, False, time.perf_counter() - t0
+
+
+def swap_current(name):
+    """Point CURRENT to a snapshot atomically: readers see the old or the new name, never half"""
+    tmp = f"{CURRENT_PATH}.tmp"
+    with open(tmp, "w") as f:
+        f.write(name + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, CURRENT_PATH)
+
+
+def prune_snapshots(keep, current):
+    """Delete all but the newest `keep` snapshots (never the current one)"""
+    names = sorted(os.listdir(SNAPSHOTS_DIR), reverse=True)
+    for name in names[keep:]:
+        if name != current:
+            shutil.rmtree(os.path.join(SNAPSHOTS_DIR, name), ignore_errors=True)
+
+
+def legacy_outputs():
+    """Flat files of exports from before snapshots (dashboard/data/<table>.parquet)"""
+    paths = [path for table in TABLES
+             for path in (os.path.join(OUT_DIR, f"{table}.parquet"), os.path.join(OUT_DIR, table))
+             if os.path.exists(path)]
+    legacy_manifest = os.path.join(OUT_DIR, MANIFEST_NAME)
+    if os.path.exists(legacy_manifest):
+        paths.append(legacy_manifest)
+    return paths
+
+
+def remove_legacy_outputs(remove):
+    """Delete the flat files only when asked (--remove-legacy): they may be
+    committed to git. Otherwise just report that they are no longer read"""
+    paths = legacy_outputs()
+    if not paths:
+        return
+    if not remove:
+        print(f"{len(paths)} pre-snapshot files left in {OUT_DIR} (unused now, --remove-legacy deletes them)")
+        return
+    for path in paths:
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+    print(f"Removed {len(paths)} pre-snapshot files from {OUT_DIR}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export marts to parquet for the dashboard")
+    parser.add_argument("--compression", default="zstd", help="parquet codec: zstd, snappy, gzip, none (default: zstd)")
+    parser.add_argument("--row-group-size", type=int, default=122_880, help="rows per row group (default: 122880)")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="tables exported in parallel (default: min(4, CPUs))")
+    parser.add_argument("--force", action="store_true", help="rewrite every mart even if unchanged")
+    parser.add_argument("--keep", type=int, default=3, help="snapshots kept on disk (default: 3)")
+    parser.add_argument("--remove-legacy", action="store_true",
+                        help="delete the flat dashboard/data/<table>.parquet files of pre-snapshot exports")
+    args = parser.parse_args()
+
+    conn = duckdb.connect(DB_PATH, read_only=True)
+    options = {"compression": args.compression, "row_group_size": args.row_group_size}
+    previous_name = current_snapshot()
+    previous_dir = os.path.join(SNAPSHOTS_DIR, previous_name) if previous_name else None
+    previous = load_manifest(previous_dir)
+
+    # New snapshot: the dashboard doesn't see it until CURRENT points to it
+    name = datetime.now().strftime("%Y%m%d-%H%M%S")
+    if os.path.exists(os.path.join(SNAPSHOTS_DIR, name)):
+        name = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    snapshot_dir = os.path.join(SNAPSHOTS_DIR, name)
+    os.makedirs(snapshot_dir)
+
+    t0 = time.perf_counter()
+    manifest, written_bytes, skipped, failed = {}, 0, 0, 0
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {table: pool.submit(export_table, conn, table, options, previous.get(table),
+                                      previous_dir, snapshot_dir, args.force)
+                   for table in TABLES}
+        for table, future in futures.items():
+            try:
+                entry, unchanged, seconds = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"  {table}: ERROR - {e}")
+                continue
+            manifest[table] = entry
+            if unchanged:
+                skipped += 1
+                print(f"  {table}: unchanged ({entry['rows']} rows), linked from {previous_name}")
+                continue
+            written_bytes += entry["bytes"]
+            parts = f", {entry['months']} months" if entry["months"] is not None else ""
+            print(f"  {table}: {entry['rows']} rows{parts}, {entry['bytes'] / 1024:,.0f} KB in {seconds:.2f}s")
+    conn.close()
+
+    # Metadata-only changes (e.g. a new date column) still get a snapshot, made of hard links
+    if failed or (skipped == len(manifest) and previous_name and manifest == previous):
+        # On errors or no changes the dashboard stays on the previous snapshot
+        shutil.rmtree(snapshot_dir)
+        reason = f"{failed} errors" if failed else "no changes"
+        print(f"\n{reason}: CURRENT stays at {previous_name or '(none)'}")
+        if failed:
+            sys.exit(1)
+        remove_legacy_outputs(args.remove_legacy)
+        return
+
+    with open(os.path.join(snapshot_dir, MANIFEST_NAME), "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(timespec="seconds"), "tables": manifest}, f, indent=2)
+    swap_current(name)
+    prune_snapshots(args.keep, name)
+    print(f"\nDone! {len(manifest) - skipped} written ({written_bytes / (1024 * 1024):,.1f} MB, {args.compression}), "
+          f"{skipped} unchanged, in {time.perf_counter() - t0:.1f}s -> CURRENT = {name}")
+    remove_legacy_outputs(args.remove_legacy)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+Genera un dump MySQL sintético (formato phpMyAdmin) con el mismo esquema que
+las tablas de TABLES_TO_LOAD, para medir cómo escala scripts/load_data.py.
+Uso: python scripts/generate_dump.py out.sql[.gz|.xz|.bz2|.zst] [--scale N] [--seed N]
+     [--rows-per-insert N]
+
+--scale multiplica clientes, pedidos, líneas y sabores (1x ≈ 25k pedidos).
+Los textos incluyen comillas escapadas, paréntesis anidados, ';', '--' y '#'
+para ejercitar el tokenizer igual que un dump real.
+"""
+
+import argparse
+import bz2
+import gzip
+import io
+import lzma
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import zstandard as zstd
+except ImportError:  # solo hace falta para salida .zst
+    zstd = None
+
+# Tamaños a escala 1x; las tablas de dimensión no escalan
+BASE_ROWS = {
+    'clientes': 3_000,
+    'clientes_direcciones': 3_600,
+    'pedidos': 25_000,
+    'delivery': 6_000,
+    'pedidos_temp': 500,
+}
+LINES_PER_PEDIDO = 1.6
+SABORES_PER_LINE = 2.5
+
+# Rango de fechas de los pedidos (unix ts)
+START_TS = int(datetime(2023, 1, 1, tzinfo=timezone.utc).timestamp())
+END_TS = int(datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp())
+
+SABORES_CATEGORIAS = ['Cremas', 'Chocolates', 'Dulces de leche', 'Frutales', 'Al agua', 'Especiales']
+SABORES = [
+    'Dulce de leche', 'Dulce de leche granizado', 'Super dulce de leche', 'Chocolate',
+    'Chocolate amargo', 'Chocolate suizo', 'Chocolate con almendras', 'Frutilla a la crema',
+    'Frutilla al agua', 'Limón', 'Menta granizada', 'Banana split', 'Sambayón', 'Crema americana',
+    'Vainilla', 'Tramontana', 'Cereza', 'Durazno', 'Ananá', 'Maracuyá', 'Mascarpone',
+    'Tiramisú', 'Pistacho', 'Marroc', 'Kinotos al whisky', 'Coco', 'Flan con dulce de leche',
+    'Mousse de limón', 'Cookies & cream', 'Café', 'Crema del cielo', 'Frambuesa',
+]
+PRODUCTOS_CATEGORIAS = ['Helado por peso', 'Promos', 'Individuales', 'Postres', 'Bebidas', 'Extras']
+PRODUCTOS = [
+    ('1 KG', 0, 3, 9000), ('1/2 KG', 0, 3, 5000), ('1/4 KG', 0, 2, 2800),
+    ('Promo 1kg + 1/2', 1, 4, 13000), ('Promo 2 x 1/4', 1, 2, 5200), ('Promo 4 de 1/2', 1, 8, 18500),
+    ('Promo 3 de 1/4', 1, 6, 7800), ('Cucurucho', 2, 2, 1800), ('Vasito', 2, 1, 1200),
+    ('Capelina', 2, 2, 2200), ('Pack 4 cucuruchos', 1, 4, 6500), ('Almendrado (porción)', 3, 0, 2500),
+    ('Agua mineral', 4, 0, 900), ('Salsa de chocolate', 5, 0, 500), ('Cucurucho extra', 5, 0, 300),
+]
+ZONAS = [(1, 2.0, 500, 30), (2, 4.0, 900, 40), (3, 6.0, 1300, 50), (4, 8.0, 1800, 60),
+         (5, 10.0, 2400, 75), (6, 15.0, 3200, 90)]
+NOMBRES = ['María', 'Juan', 'Sofía', 'Martín', 'Lucía', 'Diego', 'Valentina', 'Pablo', 'Camila', 'Nicolás',
+           "D'Angelo", 'José Luis']
+APELLIDOS = ['García', 'Fernández', 'López', 'Martínez', "O'Connor", 'Rodríguez', 'Pérez', 'Gómez', 'Díaz']
+BARRIOS = ['Palermo', 'Belgrano', 'Colegiales', 'Villa Crespo', 'Núñez', 'Caballito', 'Almagro']
+# Textos que ponen a prueba el tokenizer: comillas, barras, paréntesis anidados, ';' y comentarios
+COMENTARIOS = [
+    None, None, None, '', 'Tocar timbre (depto 3 (fondo))', "Dejar con el portero 'Don Pepe'",
+    'Sin cucurucho; en pote', 'Pago exacto -- no traer cambio', 'Timbre #2 (no anda)',
+    'Ruta: Av. Cabildo\\Juramento', "It's a gift (cumple de \"Sofi\")", 'Línea 1\nLínea 2\tfin',
+    '); DROP TABLE pedidos; --', "Llamar antes (15) 5555-1234 ('celu')",
+]
+TIPOS_RETIRO = ['delivery'] * 6 + ['local'] * 3 + ['mostrador']
+TIPOS_PAGO = ['cash'] * 4 + ['mp'] * 4 + ['transfer'] * 2 + ['qr', 'posnet']
+ESTADOS = [3] * 17 + [4, 1, 2]
+
+AUDIT_COLUMNS = [
+    ('activo', 'tinyint(1) NOT NULL DEFAULT 1'),
+    ('fecha_sys', 'int(11) NOT NULL'),
+    ('last_fecha_update', 'int(11) NOT NULL'),
+    ('admin_insert', 'int(11) DEFAULT NULL'),
+    ('last_admin_update', 'int(11) DEFAULT NULL'),
+]
+
+SCHEMAS = {
+    'administradores': [
+        ('codigo', 'int(11) NOT NULL'), ('nombre', 'varchar(100) NOT NULL'),
+        ('usuario', 'varchar(50) NOT NULL'), ('clave', 'varchar(255) NOT NULL'),
+        ('permisos', 'text'),
+    ],
+    'clientes': [
+        ('codigo', 'int(11) NOT NULL'), ('nombre', 'varchar(150) NOT NULL'),
+        ('email', 'varchar(150) DEFAULT NULL'), ('telefono', 'varchar(50) DEFAULT NULL'),
+        ('google_id', 'varchar(100) DEFAULT NULL'), ('tipo', "enum('web','mostrador','alianza') NOT NULL DEFAULT 'web'"),
+    ],
+    'clientes_direcciones': [
+        ('codigo', 'int(11) NOT NULL'), ('cliente', 'int(11) NOT NULL'),
+        ('direccion', 'varchar(255) NOT NULL'), ('piso', 'varchar(10) DEFAULT NULL'),
+        ('depto', 'varchar(10) DEFAULT NULL'), ('barrio', 'varchar(100) DEFAULT NULL'),
+        ('map_lat', 'double DEFAULT NULL'), ('map_lng', 'double DEFAULT NULL'),
+        ('distancia', 'decimal(10,2) DEFAULT NULL'), ('zona', 'int(11) DEFAULT NULL'),
+        ('observaciones', 'text'),
+    ],
+    'configuracion': [
+        ('codigo', 'int(11) NOT NULL'), ('clave', 'varchar(100) NOT NULL'), ('valor', 'text'),
+    ],
+    'delivery': [
+        ('codigo', 'int(11) NOT NULL'), ('pedidos', 'varchar(255) NOT NULL'),
+        ('repartidor', 'varchar(100) DEFAULT NULL'), ('total', 'decimal(10,2) NOT NULL'),
+        ('estado', 'int(11) NOT NULL'),
+    ],
+    'horarios': [
+        ('codigo', 'int(11) NOT NULL'), ('dia', 'int(11) NOT NULL'),
+        ('apertura', 'time NOT NULL'), ('cierre', 'time NOT NULL'),
+    ],
+    'pedidos': [
+        ('codigo', 'int(11) NOT NULL'), ('cliente', 'int(11) NOT NULL'), ('direccion', 'int(11) DEFAULT NULL'),
+        ('tipo_retiro', 'varchar(20) NOT NULL'), ('tipo_pago', 'varchar(20) NOT NULL'),
+        ('mp_ID', 'varchar(50) DEFAULT NULL'), ('mp_Status', 'varchar(30) DEFAULT NULL'),
+        ('mp_TransactionAmount', 'decimal(10,2) DEFAULT NULL'), ('mp_totalPaidAmount', 'decimal(10,2) DEFAULT NULL'),
+        ('mp_netReceivedAmount', 'decimal(10,2) DEFAULT NULL'), ('mp_Fee', 'decimal(10,2) DEFAULT NULL'),
+        ('mp_PaymentType', 'varchar(30) DEFAULT NULL'), ('telefono', 'varchar(50) DEFAULT NULL'),
+        ('comentario', 'text'), ('subtotal', 'decimal(10,2) NOT NULL'), ('redondeo', 'decimal(10,2) NOT NULL DEFAULT 0.00'),
+        ('total', 'decimal(10,2) NOT NULL'), ('envio', 'decimal(10,2) NOT NULL DEFAULT 0.00'),
+        ('descuento', 'decimal(10,2) NOT NULL DEFAULT 0.00'), ('descuento_ajuste', 'decimal(10,2) NOT NULL DEFAULT 0.00'),
+        ('descuento_alianza', 'decimal(10,2) NOT NULL DEFAULT 0.00'), ('abona_con', 'decimal(10,2) DEFAULT NULL'),
+        ('estado', 'int(11) NOT NULL'), ('pagado', 'tinyint(1) NOT NULL DEFAULT 0'),
+        ('demora', 'int(11) DEFAULT NULL'), ('distancia', 'decimal(10,2) DEFAULT NULL'),
+        ('repartidor', 'varchar(100) DEFAULT NULL'), ('motivo', 'varchar(255) DEFAULT NULL'),
+    ],
+    'pedidos_productos': [
+        ('codigo', 'int(11) NOT NULL'), ('id_pedido', 'int(11) NOT NULL'),
+        ('id_producto', 'int(11) NOT NULL'), ('extras', 'text'),
+    ],
+    'pedidos_productos_sabores': [
+        ('codigo', 'int(11) NOT NULL'), ('id_pedido_producto', 'int(11) NOT NULL'), ('sabor', 'int(11) NOT NULL'),
+    ],
+    'pedidos_temp': [
+        ('codigo', 'int(11) NOT NULL'), ('sesion', 'varchar(64) NOT NULL'), ('carrito', 'longtext'),
+    ],
+    'permisos': [
+        ('codigo', 'int(11) NOT NULL'), ('nombre', 'varchar(100) NOT NULL'), ('descripcion', 'text'),
+    ],
+    'productos': [
+        ('codigo', 'int(11) NOT NULL'), ('categoria', 'int(11) NOT NULL'), ('nombre', 'varchar(150) NOT NULL'),
+        ('descripcion', 'text'), ('precio', 'decimal(10,2) NOT NULL'), ('precio_efectivo', 'decimal(10,2) DEFAULT NULL'),
+        ('precio_mp', 'decimal(10,2) DEFAULT NULL'), ('precio_transferencia', 'decimal(10,2) DEFAULT NULL'),
+        ('precio_alianza', 'decimal(10,2) DEFAULT NULL'), ('precio_mostrador', 'decimal(10,2) DEFAULT NULL'),
+        ('precio_mostrador_efectivo', 'decimal(10,2) DEFAULT NULL'), ('precio_mostrador_mp', 'decimal(10,2) DEFAULT NULL'),
+        ('precio_mostrador_transferencia', 'decimal(10,2) DEFAULT NULL'),
+        ('precio_mostrador_alianza', 'decimal(10,2) DEFAULT NULL'), ('descuento', 'int(11) NOT NULL DEFAULT 0'),
+        ('gustos', 'int(11) NOT NULL DEFAULT 0'), ('dias', "varchar(20) DEFAULT '1,2,3,4,5,6,7'"),
+        ('mostrador', 'tinyint(1) NOT NULL DEFAULT 0'),
+    ],
+    'productos_categorias': [
+        ('codigo', 'int(11) NOT NULL'), ('nombre', 'varchar(100) NOT NULL'), ('orden', 'int(11) NOT NULL DEFAULT 0'),
+    ],
+    'promos': [
+        ('codigo', 'int(11) NOT NULL'), ('nombre', 'varchar(100) NOT NULL'), ('descuento', 'int(11) NOT NULL'),
+        ('condiciones', 'text'),
+    ],
+    'sabores': [
+        ('codigo', 'int(11) NOT NULL'), ('categoria', 'int(11) NOT NULL'), ('nombre', 'varchar(100) NOT NULL'),
+        ('sinazucar', 'tinyint(1) NOT NULL DEFAULT 0'),
+    ],
+    'sabores_categorias': [
+        ('codigo', 'int(11) NOT NULL'), ('nombre', 'varchar(100) NOT NULL'), ('orden', 'int(11) NOT NULL DEFAULT 0'),
+    ],
+    'zonas': [
+        ('codigo', 'int(11) NOT NULL'), ('distancia', 'decimal(10,2) NOT NULL'), ('precio', 'decimal(10,2) NOT NULL'),
+        ('demora', 'int(11) NOT NULL'),
+    ],
+}
+
+
+def sql_value(v):
+    """Literal MySQL de un valor Python, con el escapado de mysqldump/phpMyAdmin"""
+    if v is None:
+        return 'NULL'
+    if isinstance(v, str):
+        v = v.replace('\\', '\\\\').replace("'", "\\'").replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
+        return f"'{v}'"
+    if isinstance(v, float):
+        return f'{v:.2f}'
+    return str(v)
+
+
+def audit(rng, ts):
+    """Valores de activo, fecha_sys, last_fecha_update, admin_insert, last_admin_update"""
+    updated = ts + rng.randrange(0, 86_400) if rng.random() < 0.3 else ts
+    return (1 if rng.random() < 0.97 else 0, ts, updated, rng.choice([None, 1, 2]), rng.choice([None, 1, 2, 3]))
+
+
+def random_ts(rng):
+    return rng.randrange(START_TS, END_TS)
+
+
+def gen_dimensions(rng):
+    """Tablas de dimensión: no escalan con --scale"""
+    ts = START_TS - 86_400 * 30
+    yield 'administradores', [
+        (i, f'Admin {i}', f'admin{i}', 'x' * 60, '{"pedidos": true, "caja": (1)}') + audit(rng, ts) for i in range(1, 6)]
+    yield 'configuracion', [
+        (i, f'clave_{i}', f"valor '{i}'; (v{i})") + audit(rng, ts) for i in range(1, 21)]
+    yield 'horarios', [
+        (i, i, '13:00:00', '23:30:00') + audit(rng, ts) for i in range(1, 8)]
+    yield 'permisos', [
+        (i, f'permiso_{i}', f'Permite la acción #{i} (sección {i % 3})') + audit(rng, ts) for i in range(1, 11)]
+    yield 'productos_categorias', [
+        (i, nombre, i) + audit(rng, ts) for i, nombre in enumerate(PRODUCTOS_CATEGORIAS, 1)]
+    productos = []
+    for i, (nombre, cat, gustos, precio) in enumerate(PRODUCTOS, 1):
+        p = float(precio)
+        productos.append((i, cat + 1, nombre, f'{nombre} (hasta {gustos} gustos)', p, p * 0.9, p, p * 0.95,
+                          p * 0.85, p, p * 0.9, p, p * 0.95, p * 0.85, 0, gustos, '1,2,3,4,5,6,7', 0)
+                         + audit(rng, ts))
+    yield 'productos', productos
+    yield 'promos', [
+        (i, f'Promo {i}', 10 * i, "Válida lun-jue (excepto feriados); no acumulable 'con otras'") + audit(rng, ts)
+        for i in range(1, 11)]
+    yield 'sabores_categorias', [
+        (i, nombre, i) + audit(rng, ts) for i, nombre in enumerate(SABORES_CATEGORIAS, 1)]
+    yield 'sabores', [
+        (i, rng.randrange(1, len(SABORES_CATEGORIAS) + 1), nombre, 1 if rng.random() < 0.1 else 0) + audit(rng, ts)
+        for i, nombre in enumerate(SABORES, 1)]
+    yield 'zonas', [z + audit(rng, ts) for z in ZONAS]
+
+
+def gen_clientes(rng, n):
+    for i in range(1, n + 1):
+        nombre = f'{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)}'
+        # Algunos clientes repiten mail/teléfono para que dim_mails tenga qué agrupar
+        base = i if rng.random() < 0.9 else rng.randrange(1, i + 1)
+        email = None if rng.random() < 0.1 else f'cliente{base}@mail.com'
+        telefono = None if rng.random() < 0.15 else f'11{base:08d}'
+        google_id = f'g{i:012d}' if rng.random() < 0.3 else None
+        yield (i, nombre, email, telefono, google_id, rng.choice(['web', 'web', 'mostrador', 'alianza'])) \
+            + audit(rng, random_ts(rng))
+
+
+def gen_direcciones(rng, n, n_clientes):
+    for i in range(1, n + 1):
+        zona = rng.choice(ZONAS)
+        yield (i, rng.randrange(1, n_clientes + 1), f'Calle {rng.randrange(1, 500)} {rng.randrange(100, 9000)}',
+               rng.choice([None, 'PB', '1', '5', '12']), rng.choice([None, 'A', 'B', 'C']), rng.choice(BARRIOS),
+               -34.6 + rng.random() * 0.1, -58.4 - rng.random() * 0.1, round(rng.random() * zona[1], 2), zona[0],
+               rng.choice(COMENTARIOS)) + audit(rng, random_ts(rng))
+
+
+def gen_pedidos(rng, n, n_clientes, n_direcciones):
+    """Pedidos ordenados por fecha, como los inserta la aplicación"""
+    step = (END_TS - START_TS) / n
+    for i in range(1, n + 1):
+        ts = START_TS + int(i * step) + rng.randrange(0, max(int(step), 1))
+        retiro = rng.choice(TIPOS_RETIRO)
+        pago = rng.choice(TIPOS_PAGO)
+        subtotal = float(rng.randrange(1_000, 30_000))
+        envio = float(rng.choice(ZONAS)[2]) if retiro == 'delivery' else 0.0
+        descuento = round(subtotal * 0.1, 2) if rng.random() < 0.1 else 0.0
+        total = subtotal + envio - descuento
+        estado = rng.choice(ESTADOS)
+        mp = pago == 'mp'
+        yield (i, rng.randrange(1, n_clientes + 1),
+               rng.randrange(1, n_direcciones + 1) if retiro == 'delivery' else None,
+               retiro, pago,
+               f'{rng.randrange(10**9, 10**10)}' if mp else None, 'approved' if mp else None,
+               total if mp else None, total if mp else None, round(total * 0.94, 2) if mp else None,
+               round(total * 0.06, 2) if mp else None, rng.choice(['credit_card', 'account_money']) if mp else None,
+               f'11{rng.randrange(10**7, 10**8)}', rng.choice(COMENTARIOS), subtotal, 0.0, total, envio, descuento,
+               0.0, 0.0, total + 1000 if pago == 'cash' else None, estado, 1 if estado == 3 else 0,
+               rng.choice([None, 30, 45, 60]), round(rng.random() * 10, 2) if retiro == 'delivery' else None,
+               rng.choice([None, 'Carlos', "Tito 'el rápido'"]) if retiro == 'delivery' else None,
+               'Cliente canceló (sin stock)' if estado == 4 else None) + audit(rng, ts)
+
+
+def gen_lineas(rng, n_pedidos, table_name):
+    """Filas de pedidos_productos o de pedidos_productos_sabores. Ambas salen de la misma
+    secuencia aleatoria: llamar con un rng de igual semilla da sabores consistentes con las líneas"""
+    linea_id = sabor_id = 0
+    step = (END_TS - START_TS) / n_pedidos
+    for pedido in range(1, n_pedidos + 1):
+        ts = START_TS + int(pedido * step)
+        for _ in range(max(1, round(rng.expovariate(1 / LINES_PER_PEDIDO)))):
+            linea_id += 1
+            producto = rng.randrange(1, len(PRODUCTOS) + 1)
+            extras = rng.choice([None, None, '', 'Con salsa (chocolate)', "Extra 'cucurucho'"])
+            row = (linea_id, pedido, producto, extras) + audit(rng, ts)
+            if table_name == 'pedidos_productos':
+                yield row
+            gustos = PRODUCTOS[producto - 1][2]
+            for _ in range(min(gustos, max(1, round(rng.gauss(SABORES_PER_LINE, 1)))) if gustos else 0):
+                sabor_id += 1
+                row = (sabor_id, linea_id, rng.randrange(1, len(SABORES) + 1)) + audit(rng, ts)
+                if table_name == 'pedidos_productos_sabores':
+                    yield row
+
+
+def gen_delivery(rng, n, n_pedidos):
+    for i in range(1, n + 1):
+        ids = ','.join(str(rng.randrange(1, n_pedidos + 1)) for _ in range(rng.randrange(1, 5)))
+        yield (i, ids, rng.choice(['Carlos', "Tito 'el rápido'", 'Ana']), float(rng.randrange(500, 5000)),
+               rng.choice([1, 2, 3])) + audit(rng, random_ts(rng))
+
+
+def gen_pedidos_temp(rng, n):
+    for i in range(1, n + 1):
+        carrito = '{"items": [{"id": %d, "gustos": [(%d), (%d)]}], "nota": "it\'s; ok"}' % (
+            rng.randrange(1, 16), rng.randrange(1, 33), rng.randrange(1, 33))
+        yield (i, f'{rng.getrandbits(128):032x}', carrito) + audit(rng, random_ts(rng))
+
+
+class DumpWriter:
+    """Escribe CREATE TABLE + INSERTs extendidos al estilo phpMyAdmin"""
+
+    def __init__(self, f, rows_per_insert):
+        self.f = f
+        self.rows_per_insert = rows_per_insert
+        self.counts = {}
+
+    def header(self):
+        self.f.write('-- phpMyAdmin SQL Dump\n-- Dump sintético generado por scripts/generate_dump.py\n\n'
+                     'SET SQL_MODE = "NO_AUTO_VALUE_ON_ZERO";\nSTART TRANSACTION;\nSET time_zone = "+00:00";\n\n'
+                     '/*!40101 SET @OLD_CHARACTER_SET_CLIENT=@@CHARACTER_SET_CLIENT */;\n'
+                     '/*!40101 SET NAMES latin1 */;\n\n')
+
+    def footer(self):
+        self.f.write('COMMIT;\n')
+
+    def create(self, table_name):
+        columns = SCHEMAS[table_name] + AUDIT_COLUMNS
+        body = ',\n'.join(f'  `{name}` {mysql_type}' for name, mysql_type in columns)
+        self.f.write(f'--\n-- Estructura de tabla para la tabla `{table_name}`\n--\n\n'
+                     f'CREATE TABLE `{table_name}` (\n{body}\n) ENGINE=InnoDB DEFAULT CHARSET=latin1;\n\n')
+        self.counts[table_name] = 0
+
+    def insert(self, table_name, rows):
+        columns = ', '.join(f'`{name}`' for name, _ in SCHEMAS[table_name] + AUDIT_COLUMNS)
+        batch = []
+        for row in rows:
+            batch.append('(' + ', '.join(map(sql_value, row)) + ')')
+            if len(batch) >= self.rows_per_insert:
+                self._write_insert(table_name, columns, batch)
+                batch = []
+        if batch:
+            self._write_insert(table_name, columns, batch)
+
+    def _write_insert(self, table_name, columns, batch):
+        self.f.write(f'INSERT INTO `{table_name}` ({columns}) VALUES\n' + ',\n'.join(batch) + ';\n')
+        self.counts[table_name] += len(batch)
+
+
+def open_output(out_path):
+    """Abre la salida en texto latin1 (el encoding con el que lee load_data.py),
+    comprimida según la extensión"""
+    suffix = out_path.suffix.lower()
+    if suffix == '.gz':
+        return gzip.open(out_path, 'wt', encoding='latin1', compresslevel=6)
+    if suffix == '.xz':
+        return lzma.open(out_path, 'wt', encoding='latin1')
+    if suffix == '.bz2':
+        return bz2.open(out_path, 'wt', encoding='latin1')
+    if suffix == '.zst':
+        if zstd is None:
+            print("❌ Para generar .zst instalá zstandard (pip install zstandard)")
+            sys.exit(1)
+        return io.TextIOWrapper(zstd.ZstdCompressor().stream_writer(open(out_path, 'wb')), encoding='latin1')
+    return open(out_path, 'w', encoding='latin1')
+
+
+def generate(out_path, scale=1.0, seed=42, rows_per_insert=1000):
+    """Escribe el dump y devuelve las filas generadas por tabla"""
+    rng = random.Random(seed)
+    n = {t: max(1, int(rows * scale)) for t, rows in BASE_ROWS.items()}
+    with open_output(out_path) as f:
+        w = DumpWriter(f, rows_per_insert)
+        w.header()
+        for table_name, rows in gen_dimensions(rng):
+            w.create(table_name)
+            w.insert(table_name, rows)
+        for table_name, rows in [
+            ('clientes', gen_clientes(rng, n['clientes'])),
+            ('clientes_direcciones', gen_direcciones(rng, n['clientes_direcciones'], n['clientes'])),
+            ('pedidos', gen_pedidos(rng, n['pedidos'], n['clientes'], n['clientes_direcciones'])),
+            ('delivery', gen_delivery(rng, n['delivery'], n['pedidos'])),
+            ('pedidos_temp', gen_pedidos_temp(rng, n['pedidos_temp'])),
+        ]:
+            w.create(table_name)
+            w.insert(table_name, rows)
+        # Dos pasadas con la misma semilla: memoria constante a cualquier escala
+        for table_name in ('pedidos_productos', 'pedidos_productos_sabores'):
+            w.create(table_name)
+            w.insert(table_name, gen_lineas(random.Random(seed + 1), n['pedidos'], table_name))
+        w.footer()
+        return w.counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera un dump MySQL sintético para benchmarks")
+    parser.add_argument('out', help="archivo de salida (.sql, .sql.gz, .sql.xz, .sql.bz2, .sql.zst)")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="factor de escala de clientes/pedidos/líneas/sabores (default: 1)")
+    parser.add_argument('--seed', type=int, default=42, help="semilla del generador (default: 42)")
+    parser.add_argument('--rows-per-insert', type=int, default=1000,
+                        help="filas por INSERT extendido (default: 1000)")
+    args = parser.parse_args()
+
+    out_path = Path(args.out)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    print(f"🏭 Generando dump sintético x{args.scale:g}: {out_path}")
+    t0 = time.perf_counter()
+    counts = generate(out_path, args.scale, args.seed, args.rows_per_insert)
+    elapsed = time.perf_counter() - t0
+    total = sum(counts.values())
+    for t, c in counts.items():
+        print(f"   {t}: {c:,}")
+    print(f"\n✅ {total:,} filas, {out_path.stat().st_size / 1e6:.1f} MB en {elapsed:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,33 @@
 #!/usr/bin/env python3
 """
 Script para cargar datos de MySQL dump a DuckDB
-Uso: python scripts/load_data.py path/to/dump.sql
+Uso: python scripts/load_data.py path/to/dump.sql[.gz|.xz|.bz2|.zst] [--mode sql|arrow] [--batch-size N]
+     [--workers N] [--incremental] [--skip-unchanged] [--resume] [--checkpoint-every N]
 """
 
+import argparse
+import bz2
 import duckdb
+import gzip
+import hashlib
+import lzma
 import re
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # solo hace falta para --mode arrow
+    pa = pc = None
+
+try:
+    import zstandard as zstd
+except ImportError:  # solo hace falta para dumps .zst
+    zstd = None
+
 TABLES_TO_LOAD = [
     'administradores', 'clientes', 'clientes_direcciones', 'configuracion',
     'delivery', 'horarios', 'pedidos', 'pedidos_productos',
@@ -16,12 +35,44 @@ TABLES_TO_LOAD = [
     'productos_categorias', 'promos', 'sabores', 'sabores_categorias', 'zonas',
 ]
 
+# Tamaño de cada lectura del dump: la memoria queda acotada a esto + la sentencia más larga
+CHUNK_SIZE = 1024 * 1024
+# Filas por lote en el modo arrow
+BATCH_SIZE = 50_000
+# Sentencias por transacción en la carga secuencial: cada COMMIT deja un checkpoint para --resume
+CHECKPOINT_EVERY = 100
+
+_CREATE_NAME_RE = re.compile(r"CREATE TABLE (?:IF NOT EXISTS )?`(\w+)`", re.IGNORECASE)
+_INSERT_RE = re.compile(r"INSERT INTO `(\w+)`\s*(?:\(([^)]+)\)\s*)?VALUES\s*", re.IGNORECASE)
+# Fuera de un string solo importan: comillas, fin de sentencia y comentarios de línea
+_OUTSIDE_RE = re.compile(r"[';#]|--")
+_INSIDE_RE = re.compile(r"[\\']")
+# Formatos comprimidos aceptados, detectados por contenido y no por extensión
+_COMPRESSION_MAGIC = [
+    (b'\x1f\x8b', 'gzip'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'BZh', 'bz2'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+]
+
+# Modo incremental: clave de las tablas y columnas (unix ts) que marcan una modificación
+PRIMARY_KEY = 'codigo'
+UPDATE_COLUMNS = ('last_fecha_update', 'fecha_sys')
+
+_LEADING_COMMENTS_RE = re.compile(r"(?:\s+|--[^\n]*(?:\n|$)|#[^\n]*(?:\n|$)|/\*.*?\*/)*", re.DOTALL)
+# Tokens de un bloque VALUES: string entre comillas | literal suelto | paréntesis
+_VALUE_TOKEN_RE = re.compile(r"'((?:[^'\\]+|\\.|'')*)'|([^,()'\s]+)|([()])", re.DOTALL)
+_STRING_LITERAL_RE = re.compile(r"'((?:[^'\\]+|\\.|'')*)'", re.DOTALL)
+_ESCAPE_RE = re.compile(r"\\(.)|''", re.DOTALL)
+_ESCAPES = {'0': '\0', 'b': '\b', 'n': '\n', 'r': '\r', 't': '\t', 'Z': '\x1a'}
+
 def extract_create_table(sql_content, table_name):
-    pattern = rf"CREATE TABLE `{table_name}` \((.*?)\) ENGINE="
+    pattern = rf"CREATE TABLE (?:IF NOT EXISTS )?`{table_name}` \((.*?)\) ENGINE="
     match = re.search(pattern, sql_content, re.DOTALL | re.IGNORECASE)
     return match.group(1) if match else None
 
 def parse_column_def(col_def):
+    """Devuelve (nombre, tipo_duckdb) o None si la línea no es una columna"""
     col_def = col_def.strip()
     if col_def.upper().startswith(('PRIMARY KEY', 'KEY ', 'UNIQUE KEY', 'CONSTRAINT', 'INDEX', 'FULLTEXT')):
         return None
@@ -30,8 +81,7 @@ def parse_column_def(col_def):
         return None
     col_name = col_match.group(1)
     col_type_def = col_match.group(2)
-    duckdb_type = convert_mysql_type(col_type_def)
-    return f'"{col_name}" {duckdb_type}'
+    return col_name, convert_mysql_type(col_type_def)
 
 def convert_mysql_type(mysql_type):
     t = mysql_type.upper().strip()
@@ -54,7 +104,8 @@ def convert_mysql_type(mysql_type):
         return 'TIME'
     return 'VARCHAR'
 
-def create_duckdb_table(conn, table_name, columns_sql):
+def parse_columns(columns_sql):
+    """Lista de (nombre, tipo_duckdb) a partir del cuerpo de un CREATE TABLE"""
     columns = []
     current_col = ""
     paren_depth = 0
@@ -74,9 +125,13 @@ def create_duckdb_table(conn, table_name, columns_sql):
         col = parse_column_def(current_col)
         if col:
             columns.append(col)
+    return columns
+
+def create_duckdb_table(conn, table_name, columns):
     if not columns:
         return False
-    create_sql = f'CREATE TABLE raw."{table_name}" (\n  ' + ',\n  '.join(columns) + '\n)'
+    create_sql = (f'CREATE TABLE raw."{table_name}" (\n  '
+                  + ',\n  '.join(f'"{name}" {col_type}' for name, col_type in columns) + '\n)')
     try:
         conn.execute(f'DROP TABLE IF EXISTS raw."{table_name}"')
         conn.execute(create_sql)
@@ -85,116 +140,748 @@ def create_duckdb_table(conn, table_name, columns_sql):
         print(f"    ❌ Error SQL: {e}")
         return False
 
-def load_inserts(conn, sql_content, table_name):
-    """Carga TODOS los INSERTs para una tabla"""
-    # Buscar todos los INSERT INTO `table` ... VALUES ...;
-    # Usar finditer para encontrar todos los bloques
-    pattern = rf"INSERT INTO `{table_name}` \(([^)]+)\) VALUES\s*"
-    
-    rows_loaded = 0
-    errors = 0
-    
-    # Encontrar todas las posiciones donde empieza un INSERT
-    for match in re.finditer(pattern, sql_content, re.IGNORECASE):
-        columns = match.group(1).replace('`', '"')
-        start_pos = match.end()
-        
-        # Buscar el final del INSERT (el ;)
-        # Tenemos que manejar los paréntesis anidados en los VALUES
-        paren_depth = 0
-        end_pos = start_pos
-        in_string = False
-        escape_next = False
-        
-        for i, char in enumerate(sql_content[start_pos:], start_pos):
-            if escape_next:
-                escape_next = False
-                continue
-            if char == '\\':
-                escape_next = True
-                continue
-            if char == "'" and not in_string:
-                in_string = True
-            elif char == "'" and in_string:
-                in_string = False
-            elif not in_string:
-                if char == '(':
-                    paren_depth += 1
-                elif char == ')':
-                    paren_depth -= 1
-                elif char == ';' and paren_depth == 0:
-                    end_pos = i
-                    break
-        
-        values_block = sql_content[start_pos:end_pos]
-        
-        if not values_block.strip():
-            continue
-            
-        insert_sql = f'INSERT INTO raw."{table_name}" ({columns}) VALUES {values_block}'
-        
+def insert_values(conn, table_name, columns, values_block):
+    """Ejecuta un bloque VALUES (...),(...) de un INSERT del dump"""
+    cols = f' ({columns})' if columns else ''
+    if '\\' in values_block:
+        # DuckDB no entiende los escapes con barra de MySQL: pasar los strings a SQL estándar
+        values_block = _STRING_LITERAL_RE.sub(_standard_literal, values_block)
+    conn.execute(f'INSERT INTO raw."{table_name}"{cols} VALUES {values_block}')
+
+def _standard_literal(m):
+    return "'" + unescape_mysql(m.group(1)).replace("'", "''") + "'"
+
+def unescape_mysql(s):
+    """Des-escapa un literal de string de MySQL (\\n, \\', '', etc.)"""
+    if '\\' not in s and "''" not in s:
+        return s
+    return _ESCAPE_RE.sub(_unescape_match, s)
+
+def _unescape_match(m):
+    c = m.group(1)
+    if c is None:
+        return "'"
+    if c in '%_':  # MySQL conserva la barra en \\% y \\_
+        return '\\' + c
+    return _ESCAPES.get(c, c)
+
+def iter_value_rows(values_block):
+    """Parsea un bloque (1,'a',NULL),(2,'b',3.5) y devuelve cada fila como
+    lista de strings sin tipar (None = NULL)"""
+    row = None
+    for m in _VALUE_TOKEN_RE.finditer(values_block):
+        kind = m.lastindex
+        if kind == 1:
+            row.append(unescape_mysql(m.group(1)))
+        elif kind == 2:
+            bare = m.group(2)
+            row.append(None if bare.upper() == 'NULL' else bare)
+        elif m.group(3) == '(':
+            row = []
+        else:
+            yield row
+            row = None
+
+def arrow_type(duckdb_type):
+    """Tipo Arrow al que se castea cada columna; None = se deja como texto y
+    lo castea DuckDB con TRY_CAST (fechas: MySQL admite '0000-00-00')"""
+    if duckdb_type == 'INTEGER':
+        return pa.int32()
+    if duckdb_type == 'BIGINT':
+        return pa.int64()
+    if duckdb_type == 'DOUBLE':
+        return pa.float64()
+    if duckdb_type.startswith('DECIMAL'):
+        precision, scale = re.findall(r'\d+', duckdb_type)
+        return pa.decimal128(int(precision), int(scale))
+    if duckdb_type == 'BLOB':
+        return pa.binary()
+    if duckdb_type == 'VARCHAR':
+        return pa.string()
+    return None
+
+class TableLoader:
+    """Recibe las sentencias de una tabla a medida que aparecen en el dump
+    y las ejecuta como INSERT de texto SQL"""
+
+    def __init__(self, conn, table_name):
+        self.conn = conn
+        self.table_name = table_name
+        self.columns = []
+        self.created = False
+        self.errors = 0
+        self.blocks = 0
+        self.elapsed = 0.0
+        self.resumed = False
+        self._reported = 0
+
+    def create(self, columns_sql):
+        print(f"  Cargando {self.table_name}...")
+        self.columns = parse_columns(columns_sql)
+        self.created = create_duckdb_table(self.conn, self.table_name, self.columns)
+
+    def insert(self, columns, values_block):
+        if not self.created or not values_block.strip():
+            return
+        self.blocks += 1
+        t0 = time.perf_counter()
         try:
-            conn.execute(insert_sql)
-            rows_loaded += values_block.count('),(') + 1
+            self._insert(columns, values_block)
         except Exception as e:
-            errors += 1
-            if errors <= 3:  # Solo mostrar primeros 3 errores
-                print(f"    ⚠️  Error INSERT #{errors}: {str(e)[:60]}")
-    
-    return rows_loaded, errors
+            self._error(e)
+        self.elapsed += time.perf_counter() - t0
 
-def load_table(conn, sql_content, table_name):
-    print(f"  Cargando {table_name}...")
-    columns_sql = extract_create_table(sql_content, table_name)
-    if not columns_sql:
-        print(f"    ⚠️  No se encontró CREATE TABLE")
-        return False
-    if not create_duckdb_table(conn, table_name, columns_sql):
-        return False
-    
-    rows, errors = load_inserts(conn, sql_content, table_name)
-    
-    actual_rows = conn.execute(f'SELECT COUNT(*) FROM raw."{table_name}"').fetchone()[0]
-    
-    if actual_rows > 0:
-        msg = f"    ✅ {actual_rows:,} filas"
-        if errors > 0:
-            msg += f" ({errors} bloques con error)"
-        print(msg)
+    def _insert(self, columns, values_block):
+        insert_values(self.conn, self.table_name, columns, values_block)
+
+    def _error(self, e):
+        self.errors += 1
+        # Solo mostrar primeros 3 errores, y no repetirlos si el lote se rehace tras un ROLLBACK
+        if self._reported < min(self.errors, 3):
+            self._reported = self.errors
+            print(f"    ⚠️  Error INSERT #{self.errors} ({self.table_name}): {str(e)[:60]}")
+
+    def flush(self):
+        pass
+
+    def discard(self):
+        """Descarta lo pendiente de escribir (tras un ROLLBACK)"""
+        pass
+
+    def finish(self):
+        if not self.created:
+            return False
+        t0 = time.perf_counter()
+        self.flush()
+        self.elapsed += time.perf_counter() - t0
+        actual_rows = self.conn.execute(f'SELECT COUNT(*) FROM raw."{self.table_name}"').fetchone()[0]
+        if actual_rows > 0:
+            if self.resumed:  # las filas de antes del checkpoint no cuentan para el ritmo
+                msg = f"  ✅ {self.table_name}: {actual_rows:,} filas (retomada, +{self.elapsed:.2f}s)"
+            else:
+                rate = actual_rows / self.elapsed if self.elapsed > 0 else 0
+                msg = f"  ✅ {self.table_name}: {actual_rows:,} filas en {self.elapsed:.2f}s ({rate:,.0f} filas/s)"
+            if self.errors > 0:
+                msg += f" ({self.errors} bloques con error)"
+            print(msg)
+        else:
+            print(f"  ⚠️  {self.table_name}: sin datos")
+        return True
+
+class ArrowTableLoader(TableLoader):
+    """Parsea los VALUES a lotes columnares tipados y los agrega vía Arrow,
+    sin que DuckDB tenga que re-parsear el texto SQL"""
+
+    def __init__(self, conn, table_name, batch_size=BATCH_SIZE):
+        if pa is None:
+            raise RuntimeError("El modo arrow necesita pyarrow (pip install pyarrow)")
+        super().__init__(conn, table_name)
+        self.batch_size = batch_size
+        self.target = f'raw."{table_name}"'
+        self._batch_columns = None
+        self._buffers = []
+        self._pending = 0
+
+    def _insert(self, columns, values_block):
+        names = ([c.strip().strip('"') for c in columns.split(',')] if columns
+                 else [name for name, _ in self.columns])
+        rows = list(iter_value_rows(values_block))
+        if any(row is None or len(row) != len(names) for row in rows):
+            raise ValueError(f"filas con cantidad de valores distinta a {len(names)} columnas")
+        rows = self._keep_rows(names, rows)
+        if not rows:
+            return
+        if names != self._batch_columns:
+            self.flush()
+            self._batch_columns = names
+            self._buffers = [[] for _ in names]
+        for buffer, values in zip(self._buffers, zip(*rows)):
+            buffer.extend(values)
+        self._pending += len(rows)
+        if self._pending >= self.batch_size:
+            self.flush()
+
+    def _keep_rows(self, names, rows):
+        return rows
+
+    def flush(self):
+        if not self._pending:
+            return
+        types = dict(self.columns)
+        arrays, select = [], []
+        try:
+            for name, values in zip(self._batch_columns, self._buffers):
+                col_type = types.get(name, 'VARCHAR')
+                target = arrow_type(col_type)
+                array = pa.array(values, pa.string())
+                if target is None:
+                    select.append(f'TRY_CAST("{name}" AS {col_type})')
+                else:
+                    if target != pa.string():
+                        array = pc.cast(array, target)
+                    select.append(f'"{name}"')
+                arrays.append(array)
+            batch = pa.Table.from_arrays(arrays, names=self._batch_columns)
+            cols = ', '.join(f'"{name}"' for name in self._batch_columns)
+            self.conn.register('_arrow_batch', batch)
+            try:
+                self.conn.execute(f'INSERT INTO {self.target} ({cols}) '
+                                  f'SELECT {", ".join(select)} FROM _arrow_batch')
+            finally:
+                self.conn.unregister('_arrow_batch')
+        except Exception as e:
+            self._error(e)
+        self.discard()
+
+    def discard(self):
+        self._buffers = [[] for _ in self._batch_columns or []]
+        self._pending = 0
+
+class IncrementalTableLoader(ArrowTableLoader):
+    """Upsert incremental: solo escribe las filas nuevas (codigo > máximo cargado)
+    o modificadas (last_fecha_update > máximo cargado) y deja intactas las tablas
+    sin cambios. Si la tabla no existe, cambió su estructura o no tiene codigo,
+    se recarga completa. Las filas borradas en origen no se detectan."""
+
+    def __init__(self, conn, table_name, batch_size=BATCH_SIZE):
+        super().__init__(conn, table_name, batch_size)
+        self.full = True
+        self.hwm_key = self.hwm_update = None
+        self.update_col = None
+
+    def create(self, columns_sql):
+        self.columns = parse_columns(columns_sql)
+        names = [name for name, _ in self.columns]
+        existing = self.conn.execute(
+            "SELECT column_name, data_type FROM information_schema.columns "
+            "WHERE table_schema = 'raw' AND table_name = ? ORDER BY ordinal_position",
+            [self.table_name]).fetchall()
+        self.update_col = next((c for c in UPDATE_COLUMNS if c in names), None)
+        if existing != [tuple(c) for c in self.columns] or PRIMARY_KEY not in names:
+            print(f"  Cargando {self.table_name} (completa)...")
+            self.created = create_duckdb_table(self.conn, self.table_name, self.columns)
+            return
+        self.full = False
+        self.hwm_key, self.hwm_update = read_high_water_mark(self.conn, self.table_name, self.update_col)
+        print(f"  Cargando {self.table_name} (delta desde codigo > {self.hwm_key})...")
+        self.target = f'"_delta_{self.table_name}"'
+        cols = ', '.join(f'"{name}" {col_type}' for name, col_type in self.columns)
+        self.conn.execute(f'CREATE OR REPLACE TEMP TABLE {self.target} ({cols})')
+        self.created = True
+
+    def _keep_rows(self, names, rows):
+        if self.full:
+            return rows
+        k = names.index(PRIMARY_KEY)
+        u = names.index(self.update_col) if self.update_col in names else None
+        hwm_key = self.hwm_key if self.hwm_key is not None else float('-inf')
+        hwm_update = self.hwm_update if self.hwm_update is not None else float('-inf')
+        return [row for row in rows
+                if row[k] is None or int(row[k]) > hwm_key
+                or (u is not None and row[u] is not None and int(row[u]) > hwm_update)]
+
+    def finish(self):
+        if self.full or not self.created:
+            loaded = super().finish()
+            if loaded:
+                save_high_water_mark(self.conn, self.table_name, self.update_col)
+            return loaded
+        t0 = time.perf_counter()
+        self.flush()
+        changed = self.conn.execute(f'SELECT COUNT(*) FROM {self.target}').fetchone()[0]
+        if changed:
+            self.conn.execute("BEGIN TRANSACTION")
+            try:
+                self.conn.execute(f'DELETE FROM raw."{self.table_name}" WHERE "{PRIMARY_KEY}" IN '
+                                  f'(SELECT "{PRIMARY_KEY}" FROM {self.target})')
+                self.conn.execute(f'INSERT INTO raw."{self.table_name}" SELECT * FROM {self.target}')
+                save_high_water_mark(self.conn, self.table_name, self.update_col)
+                self.conn.execute("COMMIT")
+            except Exception as e:
+                self.conn.execute("ROLLBACK")
+                self._error(e)
+        self.conn.execute(f'DROP TABLE IF EXISTS {self.target}')
+        self.elapsed += time.perf_counter() - t0
+        if changed:
+            print(f"  ✅ {self.table_name}: {changed:,} filas nuevas/modificadas en {self.elapsed:.2f}s")
+        else:
+            print(f"  💤 {self.table_name}: sin cambios")
+        return True
+
+def read_high_water_mark(conn, table_name, update_col):
+    """(max codigo, max update) registrados; si no hay estado se calculan de raw"""
+    row = conn.execute("SELECT max_codigo, max_fecha_update FROM meta.load_state WHERE table_name = ?",
+                       [table_name]).fetchone()
+    if row:
+        return row
+    update_expr = f'MAX("{update_col}")' if update_col else 'NULL'
+    return conn.execute(f'SELECT MAX("{PRIMARY_KEY}"), {update_expr} FROM raw."{table_name}"').fetchone()
+
+def save_high_water_mark(conn, table_name, update_col):
+    if not conn.execute("SELECT 1 FROM information_schema.columns WHERE table_schema = 'raw' "
+                        "AND table_name = ? AND column_name = ?", [table_name, PRIMARY_KEY]).fetchone():
+        return
+    update_expr = f'MAX("{update_col}")' if update_col else 'NULL'
+    conn.execute(f"""
+        INSERT OR REPLACE INTO meta.load_state
+        SELECT ?, MAX("{PRIMARY_KEY}"), {update_expr}, COUNT(*), now()
+        FROM raw."{table_name}"
+    """, [table_name])
+
+def create_meta_schema(conn):
+    conn.execute("CREATE SCHEMA IF NOT EXISTS meta")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS meta.load_state (
+            table_name VARCHAR PRIMARY KEY,
+            max_codigo BIGINT,
+            max_fecha_update BIGINT,
+            row_count BIGINT,
+            loaded_at TIMESTAMP WITH TIME ZONE
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS meta.table_fingerprints (
+            table_name VARCHAR PRIMARY KEY,
+            fingerprint VARCHAR,
+            section_bytes BIGINT,
+            loaded_at TIMESTAMP WITH TIME ZONE
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS meta.load_checkpoints (
+            table_name VARCHAR PRIMARY KEY,
+            dump_id VARCHAR,
+            byte_offset BIGINT,
+            blocks BIGINT,
+            done BOOLEAN,
+            updated_at TIMESTAMP WITH TIME ZONE
+        )
+    """)
+
+def dump_identity(dump_path):
+    """Identifica el dump para no retomar un checkpoint de otro archivo:
+    nombre, tamaño y hash del primer MB"""
+    with open(dump_path, 'rb') as f:
+        head = hashlib.blake2b(f.read(1024 * 1024), digest_size=8).hexdigest()
+    return f"{Path(dump_path).name}:{Path(dump_path).stat().st_size}:{head}"
+
+def save_checkpoint(conn, dump_id, loaders, offset, done=False):
+    conn.executemany(
+        "INSERT OR REPLACE INTO meta.load_checkpoints VALUES (?, ?, ?, ?, ?, now())",
+        [[t, dump_id, offset, loader.blocks, done] for t, loader in loaders.items() if loader.created])
+
+def resume_loaders(conn, loaders, dump_id):
+    """Restaura el estado de las tablas con checkpoint y devuelve el offset desde donde
+    seguir leyendo el dump (None si la carga de ese dump ya había terminado)"""
+    rows = conn.execute(
+        "SELECT table_name, dump_id, byte_offset, blocks, done FROM meta.load_checkpoints").fetchall()
+    if not rows:
+        print("  ℹ️  No hay checkpoint: se carga desde el principio")
+        return 0
+    if any(row[1] != dump_id for row in rows):
+        raise RuntimeError("el checkpoint es de otro dump; corré sin --resume para empezar de cero")
+    if all(row[4] for row in rows):
+        return None
+    for table_name, _, _, blocks, _ in rows:
+        loader = loaders.get(table_name)
+        if loader is None:
+            continue
+        loader.columns = [tuple(c) for c in conn.execute(
+            "SELECT column_name, data_type FROM information_schema.columns "
+            "WHERE table_schema = 'raw' AND table_name = ? ORDER BY ordinal_position",
+            [table_name]).fetchall()]
+        loader.created = bool(loader.columns)
+        loader.blocks = blocks
+        loader.resumed = True
+        print(f"  Retomando {table_name} ({blocks:,} bloques ya cargados)...")
+    return max(row[2] for row in rows)
+
+def detect_compression(dump_path):
+    with open(dump_path, 'rb') as f:
+        head = f.read(6)
+    return next((name for magic, name in _COMPRESSION_MAGIC if head.startswith(magic)), None)
+
+def open_dump(dump_path):
+    """Abre el dump en binario; si viene comprimido (gzip/xz/bz2/zstd) lo
+    descomprime al vuelo a medida que se lee, sin archivos temporales"""
+    compression = detect_compression(dump_path)
+    if compression == 'gzip':
+        return gzip.open(dump_path, 'rb')
+    if compression == 'xz':
+        return lzma.open(dump_path, 'rb')
+    if compression == 'bz2':
+        return bz2.open(dump_path, 'rb')
+    if compression == 'zstd':
+        if zstd is None:
+            raise RuntimeError("Los dumps .zst necesitan zstandard (pip install zstandard)")
+        return zstd.ZstdDecompressor().stream_reader(open(dump_path, 'rb'), closefd=True,
+                                                     read_across_frames=True)
+    return open(dump_path, 'rb')
+
+def iter_statements(f, chunk_size=CHUNK_SIZE, offset=0, end=None):
+    """Lee el dump (binario) de a chunks y devuelve (fin, sentencia) por cada
+    sentencia completa (sin el ;), donde fin es el offset en bytes justo después
+    del ;. Solo guarda en memoria la sentencia en curso, no el archivo entero.
+    offset es la posición actual de f; end corta la lectura en ese byte."""
+    buf = ''
+    base = offset  # offset en bytes de buf[0] (latin1: 1 byte = 1 caracter)
+    start = pos = 0
+    in_string = False
+    eof = False
+    while True:
+        m = (_INSIDE_RE if in_string else _OUTSIDE_RE).search(buf, pos)
+        need_more = m is None
+        if m:
+            i = m.start()
+            c = buf[i]
+            if in_string:
+                if c == '\\':
+                    # El caracter escapado puede estar en el próximo chunk
+                    if i + 1 < len(buf):
+                        pos = i + 2
+                    else:
+                        need_more = True
+                elif i + 1 < len(buf):
+                    if buf[i + 1] == "'":  # '' = comilla escapada
+                        pos = i + 2
+                    else:
+                        in_string = False
+                        pos = i + 1
+                elif eof:
+                    in_string = False
+                    pos = i + 1
+                else:
+                    need_more = True
+            elif c == "'":
+                in_string = True
+                pos = i + 1
+            elif c == ';':
+                yield base + i + 1, buf[start:i]
+                start = pos = i + 1
+            else:
+                # Comentario de línea (-- o #): saltar hasta el fin de línea
+                j = buf.find('\n', i)
+                if j != -1:
+                    pos = j + 1
+                elif eof:
+                    pos = len(buf)
+                else:
+                    need_more = True
+        else:
+            pos = max(pos, len(buf) - 1)
+        if need_more:
+            if eof:
+                rest = buf[start:]
+                if rest.strip():
+                    yield base + len(buf), rest
+                return
+            size = chunk_size if end is None else min(chunk_size, end - base - len(buf))
+            chunk = f.read(size).decode('latin1') if size > 0 else ''
+            eof = not chunk
+            base += start
+            buf = buf[start:] + chunk
+            pos -= start
+            start = 0
+
+def parse_statement(stmt):
+    """Clasifica una sentencia del dump.
+    Devuelve ('create', tabla, columnas_sql), ('insert', tabla, (columnas, values)) o None"""
+    body = stmt[_LEADING_COMMENTS_RE.match(stmt).end():]
+    head = body[:12].upper()
+    if head == 'CREATE TABLE':
+        m = _CREATE_NAME_RE.match(body)
+        if m:
+            return 'create', m.group(1), extract_create_table(body, m.group(1))
+    elif head.startswith('INSERT INTO'):
+        m = _INSERT_RE.match(body)
+        if m:
+            columns = m.group(2).replace('`', '"') if m.group(2) else None
+            return 'insert', m.group(1), (columns, body[m.end():])
+    return None
+
+def make_loader(conn, table_name, mode='sql', batch_size=BATCH_SIZE):
+    if mode == 'incremental':
+        return IncrementalTableLoader(conn, table_name, batch_size)
+    if mode == 'arrow':
+        return ArrowTableLoader(conn, table_name, batch_size)
+    return TableLoader(conn, table_name)
+
+def apply_statement(loader, kind, payload):
+    if kind == 'create':
+        if payload:
+            loader.create(payload)
     else:
-        print(f"    ⚠️  Sin datos")
-    
-    return True
+        loader.insert(*payload)
+
+class Checkpointer:
+    """Agrupa la carga secuencial en transacciones de `every` sentencias. Cada COMMIT
+    guarda también el offset del dump hasta donde todo quedó escrito, así --resume
+    retoma desde ahí. Si una sentencia falla la transacción queda abortada: se hace
+    ROLLBACK y el lote se rehace de a una sentencia para aislar el bloque con error."""
+
+    def __init__(self, conn, loaders, dump_id, every=CHECKPOINT_EVERY):
+        self.conn = conn
+        self.loaders = loaders
+        self.dump_id = dump_id
+        self.every = every
+        self.batch = []
+        self._begin()
+
+    def _begin(self):
+        self.conn.execute("BEGIN TRANSACTION")
+        self.batch = []
+        self.state = {t: (l.created, l.columns, l.blocks, l.errors) for t, l in self.loaders.items()}
+
+    def _failed(self):
+        return any(l.errors > self.state[t][3] for t, l in self.loaders.items())
+
+    def apply(self, offset, loader, kind, payload):
+        self.batch.append((offset, loader, kind, payload))
+        apply_statement(loader, kind, payload)
+        if self._failed() or (kind == 'create' and payload and not loader.created):
+            self._replay()
+        elif len(self.batch) >= self.every:
+            self.commit(offset)
+
+    def commit(self, offset):
+        for loader in self.loaders.values():
+            loader.flush()
+        if self._failed():
+            self._replay()
+            return
+        save_checkpoint(self.conn, self.dump_id, self.loaders, offset)
+        self.conn.execute("COMMIT")
+        self._begin()
+
+    def _replay(self):
+        self.conn.execute("ROLLBACK")
+        batch = self.batch
+        for t, loader in self.loaders.items():
+            loader.created, loader.columns, loader.blocks, loader.errors = self.state[t]
+            loader.discard()
+        for offset, loader, kind, payload in batch:
+            self.conn.execute("BEGIN TRANSACTION")
+            errors = loader.errors
+            apply_statement(loader, kind, payload)
+            loader.flush()
+            if loader.errors > errors or (kind == 'create' and payload and not loader.created):
+                # El bloque se descarta entero, pero la posición en el dump avanza
+                self.conn.execute("ROLLBACK")
+                loader.discard()
+                self.conn.execute("BEGIN TRANSACTION")
+            save_checkpoint(self.conn, self.dump_id, self.loaders, offset)
+            self.conn.execute("COMMIT")
+        self._begin()
+
+    def close(self, offset):
+        self.commit(offset)
+        self.conn.execute("COMMIT")
+
+def load_dump(conn, f, tables, mode='sql', batch_size=BATCH_SIZE, dump_id=None,
+              checkpoint_every=CHECKPOINT_EVERY, resume=False):
+    """Carga en una sola pasada todas las tablas pedidas. Con dump_id, escribe en
+    transacciones con checkpoint; con resume, sigue desde el último checkpoint."""
+    loaders = {t: make_loader(conn, t, mode, batch_size) for t in tables}
+    offset = resume_loaders(conn, loaders, dump_id) if resume else 0
+    if offset is None:
+        print("  ✅ La carga de este dump ya estaba completa")
+        return 0, 0, []
+    if offset:
+        print(f"  ⏩ Retomando desde el byte {offset:,}")
+        f.seek(offset)
+    checkpointer = Checkpointer(conn, loaders, dump_id, checkpoint_every) if dump_id else None
+    bytes_read = offset
+    for bytes_read, stmt in iter_statements(f, offset=offset):
+        parsed = parse_statement(stmt)
+        if not parsed:
+            continue
+        kind, table_name, payload = parsed
+        loader = loaders.get(table_name)
+        if loader is None:
+            continue
+        if checkpointer:
+            checkpointer.apply(bytes_read, loader, kind, payload)
+        else:
+            apply_statement(loader, kind, payload)
+    if checkpointer:
+        checkpointer.close(bytes_read)
+    print()
+    loaded = sum(1 for t in tables if finish_table(loaders[t]))
+    if checkpointer:
+        save_checkpoint(conn, dump_id, loaders, bytes_read, done=True)
+    return loaded, bytes_read - offset, []
+
+def finish_table(loader):
+    if loader.finish():
+        return True
+    if not loader.created:
+        print(f"  ⚠️  {loader.table_name}: no se encontró CREATE TABLE")
+    return False
+
+def scan_dump(f, tables):
+    """Pre-split del dump: una pasada que solo tokeniza y ubica, por tabla, el
+    cuerpo del CREATE TABLE y los rangos de bytes [inicio, fin) de sus INSERT.
+    También calcula el fingerprint de los bytes del CREATE + INSERTs de cada tabla."""
+    sections = {t: {'create': None, 'spans': [], 'bytes': 0} for t in tables}
+    hashes = {t: hashlib.blake2b(digest_size=16) for t in tables}
+    prev_end = 0
+    for end, stmt in iter_statements(f):
+        parsed = parse_statement(stmt)
+        if parsed and parsed[1] in sections:
+            kind, table_name, payload = parsed
+            section = sections[table_name]
+            hashes[table_name].update(stmt.encode('latin1'))
+            if kind == 'create':
+                section['create'] = payload
+            else:
+                spans = section['spans']
+                if spans and spans[-1][1] == prev_end:
+                    spans[-1][1] = end  # INSERTs consecutivos: un solo rango
+                else:
+                    spans.append([prev_end, end])
+                section['bytes'] += end - prev_end
+        prev_end = end
+    for t in tables:
+        sections[t]['fingerprint'] = hashes[t].hexdigest()
+    return sections, prev_end
+
+def load_spans(loader, dump_path, spans):
+    """Carga los INSERT de una tabla leyendo solo sus rangos del dump.
+    En dumps comprimidos el seek hacia adelante descomprime y descarta."""
+    with open_dump(dump_path) as f:
+        for start, end in spans:
+            f.seek(start)
+            for _, stmt in iter_statements(f, offset=start, end=end):
+                parsed = parse_statement(stmt)
+                if parsed and parsed[0] == 'insert' and parsed[1] == loader.table_name:
+                    loader.insert(*parsed[2])
+
+def load_dump_parallel(conn, dump_path, tables, workers, mode='sql', batch_size=BATCH_SIZE,
+                       skip_unchanged=False):
+    """Pre-divide el dump por tabla y carga tablas independientes en paralelo,
+    cada una con su propio cursor sobre la misma base. Con skip_unchanged, las
+    tablas cuyo fingerprint coincide con el de la última carga no se tocan."""
+    print(f"  Indexando dump...")
+    with open_dump(dump_path) as f:
+        sections, bytes_read = scan_dump(f, tables)
+    reused = []
+    if skip_unchanged:
+        stored = dict(conn.execute("SELECT table_name, fingerprint FROM meta.table_fingerprints").fetchall())
+        existing = {t for (t,) in conn.execute(
+            "SELECT table_name FROM information_schema.tables WHERE table_schema = 'raw'").fetchall()}
+        reused = [t for t in tables
+                  if sections[t]['create'] and t in existing and stored.get(t) == sections[t]['fingerprint']]
+    # Un fingerprint solo vale si la carga de la tabla terminó bien
+    conn.execute("DELETE FROM meta.table_fingerprints WHERE NOT list_contains(?, table_name)", [reused])
+    # Los CREATE van secuenciales (catálogo); los INSERT en paralelo
+    loaders = {}
+    for t in tables:
+        if t in reused:
+            continue
+        loaders[t] = make_loader(conn.cursor(), t, mode, batch_size)
+        if sections[t]['create']:
+            loaders[t].create(sections[t]['create'])
+    # Las tablas grandes primero para que no queden solas al final
+    pending = sorted((t for t in loaders if loaders[t].created),
+                     key=lambda t: sections[t]['bytes'], reverse=True)
+    print()
+    loaded = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(load_spans, loaders[t], dump_path, sections[t]['spans']): t
+                   for t in pending}
+        for future in as_completed(futures):
+            t = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                print(f"  ❌ {t}: {e}")
+                continue
+            if finish_table(loaders[t]):
+                loaded += 1
+                if loaders[t].errors == 0:
+                    save_fingerprint(conn, t, sections[t])
+    for t in loaders:
+        if not loaders[t].created:
+            finish_table(loaders[t])
+    for t in reused:
+        print(f"  ♻️  {t}: sin cambios en el dump, se reutiliza")
+    return loaded, bytes_read, reused
+
+def save_fingerprint(conn, table_name, section):
+    conn.execute("INSERT OR REPLACE INTO meta.table_fingerprints VALUES (?, ?, ?, now())",
+                 [table_name, section['fingerprint'], section['bytes']])
 
 def main():
-    if len(sys.argv) < 2:
-        print("Uso: python load_data.py <dump.sql>")
-        sys.exit(1)
-    dump_path = Path(sys.argv[1])
+    parser = argparse.ArgumentParser(description="Carga un dump MySQL a DuckDB (schema raw)")
+    parser.add_argument('dump', help="archivo .sql del dump (puede venir comprimido: gzip/xz/bz2/zstd)")
+    parser.add_argument('--mode', choices=['sql', 'arrow'], default='sql',
+                        help="sql: ejecuta los INSERT como texto; arrow: parsea a lotes tipados")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help=f"filas por lote en modo arrow (default {BATCH_SIZE:,})")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="tablas cargadas en paralelo (pre-divide el dump por tabla)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="no borra la DB: upsert solo de filas nuevas/modificadas (implica --mode arrow)")
+    parser.add_argument('--skip-unchanged', action='store_true',
+                        help="no borra la DB y saltea las tablas cuyo CREATE+INSERTs no cambió desde la última carga")
+    parser.add_argument('--resume', action='store_true',
+                        help="no borra la DB y retoma una carga interrumpida desde su último checkpoint")
+    parser.add_argument('--checkpoint-every', type=int, default=CHECKPOINT_EVERY,
+                        help=f"sentencias por transacción/checkpoint en la carga secuencial (default {CHECKPOINT_EVERY})")
+    args = parser.parse_args()
+    sequential = args.workers == 1 and not (args.incremental or args.skip_unchanged)
+    if args.resume and not sequential:
+        parser.error("--resume solo aplica a la carga secuencial (sin --workers, --incremental ni --skip-unchanged)")
+    mode = 'incremental' if args.incremental else args.mode
+    dump_path = Path(args.dump)
     if not dump_path.exists():
         print(f"Error: No existe {dump_path}")
         sys.exit(1)
     print(f"📂 Leyendo: {dump_path}")
-    with open(dump_path, 'r', encoding='latin1', errors='ignore') as f:
-        sql_content = f.read()
-    print(f"📊 Tamaño: {len(sql_content)/1024/1024:.1f} MB")
+    compression = detect_compression(dump_path)
+    size = dump_path.stat().st_size
+    print(f"📊 Tamaño: {size/1024/1024:.1f} MB" + (f" ({compression})" if compression else ""))
     db_path = Path(__file__).parent.parent / 'ainara.duckdb'
     print(f"🦆 DuckDB: {db_path}")
     
-    # Eliminar DB existente para empezar limpio
-    if db_path.exists():
+    # Eliminar DB existente para empezar limpio (salvo en modo incremental, con cache o al retomar)
+    if db_path.exists() and not (args.incremental or args.skip_unchanged or args.resume):
         db_path.unlink()
         print("🗑️  DB anterior eliminada")
     
     conn = duckdb.connect(str(db_path))
     conn.execute("CREATE SCHEMA IF NOT EXISTS raw")
-    print("\n🔄 Cargando...")
-    loaded = sum(1 for t in TABLES_TO_LOAD if load_table(conn, sql_content, t))
-    print(f"\n✅ {loaded}/{len(TABLES_TO_LOAD)} tablas")
+    create_meta_schema(conn)
+    print(f"\n🔄 Cargando (modo {mode})...")
+    t0 = time.perf_counter()
+    if args.workers > 1 or args.skip_unchanged:
+        loaded, bytes_read, reused = load_dump_parallel(conn, dump_path, TABLES_TO_LOAD, args.workers,
+                                                        mode, args.batch_size, args.skip_unchanged)
+    else:
+        # El modo incremental ya aplica sus cambios en una transacción por tabla
+        dump_id = dump_identity(dump_path) if sequential else None
+        try:
+            with open_dump(dump_path) as f:
+                loaded, bytes_read, reused = load_dump(conn, f, TABLES_TO_LOAD, mode, args.batch_size,
+                                                       dump_id, args.checkpoint_every, args.resume)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+    elapsed = time.perf_counter() - t0
+    print(f"\n✅ {loaded}/{len(TABLES_TO_LOAD)} tablas en {elapsed:.1f}s")
+    if reused:
+        print(f"♻️  {len(reused)} reutilizadas sin cambios: {', '.join(reused)}")
+    mb_read = bytes_read / 1024 / 1024
+    if compression:
+        print(f"⏱️  {size/1024/1024:.1f} MB {compression} → {mb_read:.1f} MB SQL: "
+              f"{size/1024/1024/elapsed:.1f} MB/s comprimido, {mb_read/elapsed:.1f} MB/s descomprimido")
+    else:
+        print(f"⏱️  {mb_read:.1f} MB SQL a {mb_read/elapsed:.1f} MB/s")
     print("\n📋 Resumen:")
     for (t,) in conn.execute("SELECT table_name FROM information_schema.tables WHERE table_schema='raw'").fetchall():
         c = conn.execute(f'SELECT COUNT(*) FROM raw."{t}"').fetchone()[0]
-        print(f"   {t}: {c:,}")
+        print(f"   {t}: {c:,}" + (" (reutilizada)" if t in reused else ""))
     conn.close()
     print("\n🎉 Listo! Corré: dbt run")
 
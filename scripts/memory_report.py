@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Memoria residente de cada mart cargado en pandas, antes y después de los
+dtypes compactos de dashboard/schema.py
+Uso: python scripts/memory_report.py [--data-dir dashboard/data]
+
+"antes": como cargaban los marts sin schema (texto como object, enteros
+int64, enteros con nulos como float64). "después": como los carga data.py
+(categóricas, enteros chicos, enteros con nulos, texto de Arrow).
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'dashboard'))
+from schema import TABLE_DTYPES, pandas_dtypes  # noqa: E402
+
+PARTITION_COL = 'anio_mes'
+
+
+def snapshot_dir(data_dir):
+    """Snapshot al que apunta CURRENT, o data_dir si no hay snapshots"""
+    current = data_dir / 'CURRENT'
+    if current.exists():
+        return data_dir / 'snapshots' / current.read_text().strip()
+    return data_dir
+
+
+def read_mart(path):
+    if path.is_dir():
+        dataset = ds.dataset(path, format='parquet', partitioning='hive')
+    else:
+        dataset = ds.dataset(path, format='parquet')
+    return dataset.to_table(columns=[c for c in dataset.schema.names if c != PARTITION_COL])
+
+
+def plain_frame(table):
+    """Sin schema: diccionarios a texto, enteros a int64, texto como object"""
+    fields = []
+    for field in table.schema:
+        if pa.types.is_dictionary(field.type):
+            field = field.with_type(field.type.value_type)
+        elif pa.types.is_integer(field.type):
+            field = field.with_type(pa.int64())
+        fields.append(field)
+    df = table.cast(pa.schema(fields)).to_pandas()
+    text = [c for c in df.columns if pd.api.types.is_string_dtype(df[c])]
+    return df.astype({c: object for c in text})
+
+
+def mb(df):
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memoria por mart con y sin dtypes compactos")
+    parser.add_argument('--data-dir', default=str(PROJECT_ROOT / 'dashboard' / 'data'),
+                        help="directorio del export (default: dashboard/data)")
+    args = parser.parse_args()
+
+    base = snapshot_dir(Path(args.data_dir))
+    marts = sorted({p.name.removesuffix('.parquet') for p in base.iterdir()
+                    if p.suffix == '.parquet' or (p.is_dir() and p.name != 'snapshots')})
+    if not marts:
+        print(f"❌ No hay marts exportados en {base}")
+        sys.exit(1)
+
+    print(f"📦 Memoria en pandas por mart ({os.path.relpath(base, PROJECT_ROOT)})\n")
+    print(f"| {'mart':<24} | {'filas':>8} | {'antes MB':>9} | {'después MB':>10} | {'ahorro':>6} |")
+    print(f"|{'-' * 26}|{'-' * 9}:|{'-' * 10}:|{'-' * 11}:|{'-' * 7}:|")
+    total_antes = total_despues = 0
+    for mart in marts:
+        path = base / mart if (base / mart).is_dir() else base / f"{mart}.parquet"
+        table = read_mart(path)
+        antes = mb(plain_frame(table))
+        nullable = {c for c in table.column_names if table.column(c).null_count}
+        df = table.to_pandas()
+        despues = mb(df.astype(pandas_dtypes(mart, df.columns, nullable)))
+        total_antes += antes
+        total_despues += despues
+        marca = '' if mart in TABLE_DTYPES else ' *'
+        print(f"| {mart + marca:<24} | {len(df):>8,} | {antes:>9,.2f} | {despues:>10,.2f} | "
+              f"{1 - despues / antes if antes else 0:>6.0%} |")
+    print(f"| {'total':<24} | {'':>8} | {total_antes:>9,.2f} | {total_despues:>10,.2f} | "
+          f"{1 - total_despues / total_antes:>6.0%} |")
+    print("\n* sin dtypes en schema.py (solo texto de Arrow)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Perfil de una corrida de dbt: tiempo, filas y tamaño de cada modelo, más
+EXPLAIN ANALYZE de los más lentos (pico de memoria de DuckDB y operadores más
+caros). Guarda todo en meta.dbt_profile de ainara.duckdb y escribe un reporte
+markdown comparado contra la corrida anterior.
+Uso: python scripts/profile_dbt.py [--run] [--run-results PATH] [--top N]
+     [--report PATH] [--threshold 0.2]
+
+Sin --run perfila el último target/run_results.json (tiene que ser de un
+dbt run o dbt build). EXPLAIN ANALYZE vuelve a ejecutar el SELECT compilado
+de cada modelo sin escribir nada; --top acota cuántos se repiten.
+La historia vive en ainara.duckdb: una carga completa con load_data.py la
+borra (--mode incremental y --skip-unchanged la conservan).
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+import duckdb
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DB_PATH = PROJECT_ROOT / 'ainara.duckdb'
+RUN_RESULTS_PATH = PROJECT_ROOT / 'target' / 'run_results.json'
+MANIFEST_PATH = PROJECT_ROOT / 'target' / 'manifest.json'
+REPORT_PATH = PROJECT_ROOT / 'benchmarks' / 'dbt_profile.md'
+# Diferencias menores a esto son ruido aunque superen --threshold
+MIN_REGRESSION_SECONDS = 0.2
+
+
+def load_models(run_results_path, manifest_path):
+    """(metadata de la corrida, [resultado de cada modelo con su materialización y lenguaje])"""
+    with open(run_results_path) as f:
+        run_results = json.load(f)
+    which = run_results.get('args', {}).get('which')
+    if which not in ('run', 'build'):
+        print(f"❌ {run_results_path} es de un dbt {which}, no de un dbt run/build")
+        sys.exit(1)
+
+    nodes = {}
+    if Path(manifest_path).exists():
+        with open(manifest_path) as f:
+            nodes = json.load(f)['nodes']
+
+    models = []
+    for r in run_results['results']:
+        if not r['unique_id'].startswith('model.'):
+            continue
+        node = nodes.get(r['unique_id'], {})
+        models.append({
+            'modelo': r['unique_id'].split('.')[-1],
+            'relation': r.get('relation_name'),
+            'estado': r['status'],
+            'segundos': r['execution_time'],
+            'materializacion': node.get('config', {}).get('materialized', ''),
+            'lenguaje': node.get('language', 'sql'),
+            'sql': r.get('compiled_code'),
+        })
+    return run_results['metadata'], models
+
+
+def relation_stats(conn, relation, block_size):
+    """(filas, bytes aproximados) de un modelo; las vistas no ocupan bloques"""
+    if not relation:
+        return None, None
+    try:
+        filas = conn.execute(f"SELECT COUNT(*) FROM {relation}").fetchone()[0]
+        is_table = conn.execute(
+            "SELECT COUNT(*) FROM duckdb_tables() WHERE database_name || '.' || schema_name || '.' || table_name = ?",
+            [relation.replace('"', '')]).fetchone()[0] > 0
+        if not is_table:
+            return filas, 0
+        # Bloques distintos que ocupan sus segmentos (cota aproximada: un bloque puede ser compartido)
+        blocks = conn.execute(
+            f"SELECT COUNT(DISTINCT block_id) FROM pragma_storage_info('{relation.replace(chr(34), '')}')").fetchone()[0]
+        return filas, blocks * block_size
+    except duckdb.Error:
+        return None, None
+
+
+def operator_times(node, totals):
+    """Suma operator_timing por tipo de operador en el árbol del plan"""
+    if node.get('operator_type') not in (None, 'EXPLAIN_ANALYZE'):
+        totals[node['operator_type']] += node.get('operator_timing', 0)
+    for child in node.get('children', []):
+        operator_times(child, totals)
+    return totals
+
+
+def explain_model(conn, sql):
+    """(segundos, pico de memoria en MB, resumen de operadores) de un EXPLAIN ANALYZE"""
+    plan = json.loads(conn.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}").fetchall()[0][1])
+    totals = operator_times(plan, defaultdict(float))
+    total = sum(totals.values()) or 1
+    top = sorted(totals.items(), key=lambda kv: kv[1], reverse=True)[:3]
+    resumen = ' · '.join(f"{op} {t / total:.0%}" for op, t in top)
+    return plan.get('latency', 0), plan.get('system_peak_buffer_memory', 0) / (1024 * 1024), resumen
+
+
+def ensure_profile_table(conn):
+    conn.execute("CREATE SCHEMA IF NOT EXISTS meta")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS meta.dbt_profile (
+            invocation_id VARCHAR,
+            generated_at TIMESTAMPTZ,
+            modelo VARCHAR,
+            materializacion VARCHAR,
+            estado VARCHAR,
+            segundos DOUBLE,
+            filas BIGINT,
+            bytes BIGINT,
+            replay_segundos DOUBLE,
+            pico_memoria_mb DOUBLE,
+            plan VARCHAR,
+            PRIMARY KEY (invocation_id, modelo)
+        )
+    """)
+
+
+def previous_run(conn, invocation_id, generated_at):
+    """{modelo: (segundos, filas)} de la última corrida perfilada antes de esta"""
+    row = conn.execute("""
+        SELECT invocation_id FROM meta.dbt_profile
+        WHERE invocation_id != ? AND generated_at < ?
+        GROUP BY invocation_id ORDER BY max(generated_at) DESC LIMIT 1
+    """, [invocation_id, generated_at]).fetchone()
+    if not row:
+        return None, {}
+    rows = conn.execute("SELECT modelo, segundos, filas FROM meta.dbt_profile WHERE invocation_id = ?", [row[0]]).fetchall()
+    return row[0], {m: (s, f) for m, s, f in rows}
+
+
+def fmt_mb(value):
+    return f"{value / (1024 * 1024):,.1f}" if value else '-'
+
+
+def write_report(path, metadata, models, previous_id, previous, threshold):
+    total = sum(m['segundos'] for m in models)
+    lines = [
+        f"# Perfil de dbt run — {metadata['generated_at'][:19].replace('T', ' ')}",
+        '',
+        f"- Corrida: `{metadata['invocation_id']}` (dbt {metadata['dbt_version']})",
+        f"- Modelos: {len(models)}, suma de tiempos: {total:.1f}s",
+        f"- Comparada con: `{previous_id}`" if previous_id else '- Sin corrida anterior para comparar',
+        '',
+    ]
+
+    regressions = []
+    for m in models:
+        prev = previous.get(m['modelo'])
+        m['cambio'] = None
+        if prev and prev[0]:
+            m['cambio'] = m['segundos'] / prev[0] - 1
+            if m['cambio'] > threshold and m['segundos'] - prev[0] > MIN_REGRESSION_SECONDS:
+                regressions.append(m)
+
+    if regressions:
+        lines += [f"## ⚠️ Regresiones (> {threshold:.0%} más lento)", '']
+        for m in regressions:
+            lines.append(f"- **{m['modelo']}**: {previous[m['modelo']][0]:.2f}s → {m['segundos']:.2f}s ({m['cambio']:+.0%})")
+        lines.append('')
+
+    profiled = [m for m in models if m['plan'] is not None]
+    if profiled:
+        lines += ['## Modelos más lentos (EXPLAIN ANALYZE)', '',
+                  '| modelo | segundos | replay | pico memoria (MB) | operadores |',
+                  '|---|---:|---:|---:|---|']
+        for m in profiled:
+            lines.append(f"| {m['modelo']} | {m['segundos']:.2f} | {m['replay_segundos']:.2f} | "
+                         f"{m['pico_memoria_mb']:,.1f} | {m['plan']} |")
+        lines.append('')
+
+    lines += ['## Todos los modelos', '',
+              '| modelo | materialización | estado | segundos | vs anterior | filas | MB |',
+              '|---|---|---|---:|---:|---:|---:|']
+    for m in models:
+        cambio = f"{m['cambio']:+.0%}" if m['cambio'] is not None else '-'
+        filas = f"{m['filas']:,}" if m['filas'] is not None else '-'
+        lines.append(f"| {m['modelo']} | {m['materializacion']} | {m['estado']} | {m['segundos']:.2f} | "
+                     f"{cambio} | {filas} | {fmt_mb(m['bytes'])} |")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text('\n'.join(lines) + '\n')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perfil por modelo de una corrida de dbt")
+    parser.add_argument('--run', action='store_true', help="correr dbt run antes de perfilar")
+    parser.add_argument('--run-results', default=str(RUN_RESULTS_PATH),
+                        help="run_results.json a perfilar (default: target/run_results.json)")
+    parser.add_argument('--top', type=int, default=10, help="modelos lentos con EXPLAIN ANALYZE (default: 10)")
+    parser.add_argument('--report', default=str(REPORT_PATH), help=f"reporte markdown (default: {REPORT_PATH})")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="fracción de tiempo extra que cuenta como regresión (default: 0.2)")
+    args = parser.parse_args()
+
+    if args.run:
+        print("🏃 Corriendo dbt run...")
+        result = subprocess.run(['dbt', 'run', '--project-dir', str(PROJECT_ROOT), '--profiles-dir', str(PROJECT_ROOT)],
+                                cwd=PROJECT_ROOT)
+        if result.returncode != 0:
+            print("⚠️  dbt run terminó con errores: se perfilan los modelos que corrieron")
+
+    if not Path(args.run_results).exists():
+        print(f"❌ No existe: {args.run_results}")
+        sys.exit(1)
+    if not DB_PATH.exists():
+        print(f"❌ No existe: {DB_PATH}")
+        sys.exit(1)
+
+    metadata, models = load_models(args.run_results, MANIFEST_PATH)
+    models.sort(key=lambda m: m['segundos'], reverse=True)
+    print(f"📊 Perfilando {len(models)} modelos (EXPLAIN ANALYZE de los {args.top} más lentos)...")
+    explained = 0
+    for m in models:
+        m['replay_segundos'] = m['pico_memoria_mb'] = m['plan'] = None
+        # Los modelos Python no tienen un SELECT que repetir
+        if explained < args.top and m['estado'] == 'success' and m['lenguaje'] == 'sql' and m['sql']:
+            # Conexión nueva por modelo: el pico de memoria es de la instancia de DuckDB
+            conn = duckdb.connect(str(DB_PATH), read_only=True)
+            try:
+                m['replay_segundos'], m['pico_memoria_mb'], m['plan'] = explain_model(conn, m['sql'])
+                explained += 1
+                print(f"  🔎 {m['modelo']}: {m['segundos']:.2f}s, pico {m['pico_memoria_mb']:,.1f} MB — {m['plan']}")
+            except duckdb.Error as e:
+                print(f"  ⚠️  {m['modelo']}: EXPLAIN ANALYZE falló: {e}")
+            finally:
+                conn.close()
+
+    conn = duckdb.connect(str(DB_PATH))
+    block_size = conn.execute("SELECT block_size FROM pragma_database_size() LIMIT 1").fetchone()[0]
+    for m in models:
+        m['filas'], m['bytes'] = relation_stats(conn, m['relation'], block_size)
+
+    ensure_profile_table(conn)
+    generated_at = datetime.fromisoformat(metadata['generated_at'].replace('Z', '+00:00'))
+    previous_id, previous = previous_run(conn, metadata['invocation_id'], generated_at)
+    conn.execute("DELETE FROM meta.dbt_profile WHERE invocation_id = ?", [metadata['invocation_id']])
+    conn.executemany(
+        "INSERT INTO meta.dbt_profile VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [(metadata['invocation_id'], generated_at, m['modelo'], m['materializacion'], m['estado'], m['segundos'],
+          m['filas'], m['bytes'], m['replay_segundos'], m['pico_memoria_mb'], m['plan']) for m in models])
+    conn.close()
+
+    regressions = write_report(Path(args.report), metadata, models, previous_id, previous, args.threshold)
+    print(f"\n📝 Reporte en {args.report} (y en meta.dbt_profile)")
+    if regressions:
+        print(f"⚠️  Regresiones: {', '.join(m['modelo'] for m in regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Tests de dashboard/data.py sobre snapshots chicos armados en un directorio temporal
+Uso: python -m pytest tests
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'dashboard'))
+import data  # noqa: E402
+
+TZ = 'America/Buenos_Aires'
+
+
+def write_mart(snapshot, name, df, schema=None):
+    pq.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False),
+                   snapshot / f"{name}.parquet")
+
+
+def test_query_buckets_in_export_timezone(tmp_path):
+    # Domingo a la noche en Buenos Aires = lunes en UTC: la semana cambia según la zona
+    created_at = pd.to_datetime([
+        '2023-07-03 10:00', '2023-07-09 21:30', '2023-07-09 23:59', '2023-07-10 00:30',
+    ]).tz_localize(TZ)
+    write_mart(tmp_path, 'fct_pedidos', pd.DataFrame({'pedido_id': range(4), 'created_at': created_at}))
+
+    semanas = data._query(str(tmp_path), """
+        SELECT date_trunc('week', created_at)::DATE AS semana, count(*) AS pedidos
+        FROM fct_pedidos GROUP BY 1 ORDER BY 1
+    """)
+
+    esperado = created_at.to_series().dt.tz_localize(None).dt.to_period('W').dt.start_time.value_counts().sort_index()
+    assert list(pd.to_datetime(semanas['semana'])) == list(esperado.index)
+    assert list(semanas['pedidos']) == list(esperado)
+
+
+def test_load_keeps_nulls_in_compact_ints(tmp_path):
+    # Días sin clima (LEFT JOIN) traen nulos; como en los exports sin schema
+    # (dashboard/data), los enteros con nulos llegan como double
+    fecha = pd.date_range('2026-02-11', periods=3, freq='D', tz=TZ)
+    schema = pa.schema([('fecha', pa.timestamp('us', tz=TZ)), ('flg_precipitaciones', pa.float64()),
+                        ('viento_max_kmh', pa.float64()), ('pedidos_totales', pa.int32())])
+    write_mart(tmp_path, 'fct_ventas_diarias', pd.DataFrame({
+        'fecha': fecha,
+        'flg_precipitaciones': [1, None, None],
+        'viento_max_kmh': [30.5, None, None],
+        'pedidos_totales': [10, None, 12],  # declarado "int32": pasa a Int32 en vez de fallar
+    }), schema)
+
+    df = data._read_table(str(tmp_path), 'fct_ventas_diarias')
+
+    assert str(df['flg_precipitaciones'].dtype) == 'Int8'
+    assert str(df['pedidos_totales'].dtype) == 'Int32'
+    assert df['flg_precipitaciones'].isna().tolist() == [False, True, True]
+    assert df['viento_max_kmh'].iloc[0] == 30.5
+
+
+def test_load_drops_categories_outside_the_range(tmp_path):
+    # "Otro" solo aparece fuera del rango pedido: no tiene que quedar como categoría
+    write_mart(tmp_path, 'rpt_egresos', pd.DataFrame({
+        'mes': pd.to_datetime(['2024-01-01', '2024-02-01', '2024-03-01']),
+        'categoria': pd.Categorical(['Insumos', 'Otro', 'Insumos']),
+        'monto_total': [100.0, 50.0, 80.0],
+    }))
+
+    df = data._read_table(str(tmp_path), 'rpt_egresos', 'mes', '2024-03-01', '2024-03-31')
+
+    assert list(df['categoria'].cat.categories) == ['Insumos']
+    assert df['categoria'].value_counts().to_dict() == {'Insumos': 1}
+
+
+def test_partial_reads_skip_the_shared_cache(tmp_path, monkeypatch):
+    # Columnas/rango a medida (14_Clima) van a su propio cache: no desalojan marts enteros
+    write_mart(tmp_path, 'rpt_egresos', pd.DataFrame({
+        'mes': pd.to_datetime(['2024-01-01', '2024-02-01']),
+        'categoria': pd.Categorical(['Insumos', 'Otro']),
+        'monto_total': [100.0, 50.0],
+    }))
+    monkeypatch.setattr(data._local, 'snapshot', str(tmp_path), raising=False)
+    monkeypatch.setattr(data, '_shared_table', None)
+
+    df = data.load_table('rpt_egresos', 'mes', '2024-02-01', columns=['mes', 'monto_total'])
+
+    assert list(df.columns) == ['mes', 'monto_total']
+    assert df['monto_total'].tolist() == [50.0]